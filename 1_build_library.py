@@ -5,13 +5,17 @@ import time
 import json
 import hashlib
 import mimetypes
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+import queue
+import threading
 import urllib.parse
 import requests
 import pandas as pd
 from slugify import slugify
 from dateutil.parser import parse as dtparse
 
-import boto3
 from botocore.exceptions import ClientError
 
 from selenium import webdriver
@@ -22,20 +26,18 @@ from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
 from dotenv import load_dotenv
 from pathlib import Path
 
+from saij_http import iter_paginas_http
+from downloader import Downloader
+from s3_storage import put_bytes, put_many, upload_stream, iter_file
+from crawl_state import CrawlState, BlobIndex, METADATA, COMPLETO, ERROR
+from duplicados import NearDupIndex, firma, texto_documento
+
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env", override=True)
-def s3_client():
-    region = "us-east-1"
-    session = boto3.session.Session(
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        aws_session_token=os.getenv("AWS_SESSION_TOKEN"),  
-        region_name=region,
-    )
-    return session.client("s3", region_name=region)
 
 
 # ==========================
@@ -44,7 +46,16 @@ def s3_client():
 SAIJ_URL = "https://www.saij.gob.ar/buscador/jurisprudencia-nacional"
 S3_BUCKET_NAME = "documentos-lexgo-ia-scrapping"  
 S3_PREFIX_BASE = "jurisprudencia/pba-laboral"                   
+S3_BLOB_PREFIX = f"{S3_PREFIX_BASE}/blobs"   # documentos por SHA-256
 REQUESTS_TIMEOUT = (10, 25)  # (connect, read)
+# Techo de cortesía: nunca más de N Chrome simultáneos contra SAIJ
+MAX_CHROME_WORKERS = int(os.getenv("SAIJ_MAX_WORKERS", "4"))
+ARRANQUE_ESCALONADO_SEG = 1.5  # separa el arranque de cada worker
+DOWNLOAD_CONCURRENCY = 8       # descargas simultáneas de documentos
+DOWNLOAD_RATE_PER_HOST = 4.0   # pedidos/seg por host (token bucket)
+PIPELINE_MAX_PENDIENTES = 100  # filas en vuelo entre scraper y subida (acota memoria)
+CRAWL_STATE_PATH = BASE_DIR / "data" / "crawl_state.sqlite"
+CASI_DUP_UMBRAL = 0.9          # Jaccard estimado a partir del cual no se guarda el documento
 
 
 # ==========================
@@ -130,12 +141,68 @@ def apply_filters(driver, texto=None, fuero="Laboral",
     )
     time.sleep(1.0)
 
-def _parse_cards(driver):
+CARD_XPATH = "//a[contains(@href, '/')][normalize-space()][1]/ancestor::*[self::div or self::li][1]"
+TRIBUNAL_KEYS = ("Tribunal", "Cámara", "Juzgado")
+FECHA_RE = re.compile(r"(\d{2}[/-]\d{2}[/-]\d{4}|\d{4}-\d{2}-\d{2})")
+
+# Extrae todas las cards en un solo execute_script (un único round trip a chromedriver).
+# Usa los mismos XPath que _parse_cards_webdriver para devolver lo mismo.
+CARDS_JS = """
+const xp = (expr, ctx) => document.evaluate(
+    expr, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const cards = xp(arguments[0], document);
+const out = [];
+for (let i = 0; i < cards.snapshotLength; i++) {
+    const c = cards.snapshotItem(i);
+    const a = xp(".//a[normalize-space()][1]", c).snapshotItem(0);
+    if (!a) continue;
+    const p = xp(".//p[normalize-space()][1]", c).snapshotItem(0);
+    out.push({
+        titulo: a.innerText || "",
+        link: a.href || "",
+        resumen: p ? p.innerText : "",
+        texto: c.innerText || ""
+    });
+}
+return out;
+"""
+
+def card_to_row(titulo, link, resumen, texto):
+    """Arma la fila de resultado a partir del texto crudo de una card."""
+    tribunal = ""
+    for line in texto.split("\n"):
+        l = line.strip()
+        if any(k in l for k in TRIBUNAL_KEYS):
+            tribunal = l; break
+
+    fecha = ""
+    m = FECHA_RE.search(texto)
+    if m: fecha = m.group(1)
+
+    return {
+        "titulo": titulo.strip(),
+        "tribunal": tribunal,
+        "fecha": fecha,
+        "link": link,
+        "resumen": resumen.strip()
+    }
+
+def _parse_cards_js(driver):
     rows = []
-    cards = driver.find_elements(
-        By.XPATH,
-        "//a[contains(@href, '/')][normalize-space()][1]/ancestor::*[self::div or self::li][1]"
-    )
+    seen = set()
+    for card in driver.execute_script(CARDS_JS, CARD_XPATH) or []:
+        row = card_to_row(card.get("titulo") or "", card.get("link") or "",
+                          card.get("resumen") or "", card.get("texto") or "")
+        if not row["titulo"] or (row["titulo"], row["link"]) in seen:
+            continue
+        rows.append(row)
+        seen.add((row["titulo"], row["link"]))
+    return rows
+
+def _parse_cards_webdriver(driver):
+    # Camino original: varias llamadas WebDriver por card (lento, queda como fallback)
+    rows = []
+    cards = driver.find_elements(By.XPATH, CARD_XPATH)
     seen = set()
     for c in cards:
         try:
@@ -150,28 +217,18 @@ def _parse_cards(driver):
             except:
                 resumen = ""
 
-            tribunal = ""
-            for line in c.text.split("\n"):
-                l = line.strip()
-                if any(k in l for k in ["Tribunal", "Cámara", "Juzgado"]):
-                    tribunal = l; break
-
-            fecha = ""
-            m = re.search(r"(\d{2}[/-]\d{2}[/-]\d{4}|\d{4}-\d{2}-\d{2})", c.text)
-            if m: fecha = m.group(1)
-
-            rows.append({
-                "titulo": titulo,
-                "tribunal": tribunal,
-                "fecha": fecha,
-                "link": link,
-                "resumen": resumen
-            })
+            rows.append(card_to_row(titulo, link, resumen, c.text))
             seen.add((titulo, link))
         except:
             continue
     return rows
 
+def _parse_cards(driver):
+    try:
+        return _parse_cards_js(driver)
+    except WebDriverException:
+        return _parse_cards_webdriver(driver)
+
 def _next_page(driver):
     try:
         nxt = driver.find_element(By.XPATH,
@@ -188,31 +245,136 @@ def _next_page(driver):
     except:
         return False
 
-def buscar_laboral_pba(texto=None, fecha_desde=None, fecha_hasta=None,
-                       max_paginas=5, headless=True, pausa_seg=0.8):
+def iter_paginas(driver, texto, fecha_desde, fecha_hasta, max_paginas, pausa_seg):
+    """Rinde las filas de cada página de resultados a medida que se cargan."""
+    open_search_page(driver)
+    apply_filters(driver, texto=texto, fuero="Laboral",
+                  jurisdiccion="Provincia de Buenos Aires",
+                  fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
+    page = 1
+    while True:
+        yield _parse_cards(driver)
+        time.sleep(pausa_seg)
+        if page >= max_paginas or not _next_page(driver): break
+        page += 1
+
+def _recorrer_paginas(driver, texto, fecha_desde, fecha_hasta, max_paginas, pausa_seg):
+    return [row for rows in iter_paginas(driver, texto, fecha_desde, fecha_hasta,
+                                         max_paginas, pausa_seg)
+            for row in rows]
+
+def iter_paginas_selenium(texto=None, fecha_desde=None, fecha_hasta=None,
+                          max_paginas=5, headless=True, pausa_seg=0.8):
     driver = setup_driver(headless=headless)
-    data = []
     try:
-        open_search_page(driver)
-        apply_filters(driver, texto=texto, fuero="Laboral",
-                      jurisdiccion="Provincia de Buenos Aires",
-                      fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
-        page = 1
-        while True:
-            data.extend(_parse_cards(driver))
-            time.sleep(pausa_seg)
-            if page >= max_paginas or not _next_page(driver): break
-            page += 1
-        return data
+        yield from iter_paginas(driver, texto, fecha_desde, fecha_hasta,
+                                max_paginas, pausa_seg)
     finally:
         driver.quit()
 
+def buscar_laboral_pba(texto=None, fecha_desde=None, fecha_hasta=None,
+                       max_paginas=5, headless=True, pausa_seg=0.8):
+    return [row for rows in iter_paginas_selenium(texto, fecha_desde, fecha_hasta,
+                                                  max_paginas, headless, pausa_seg)
+            for row in rows]
+
 # ==========================
-# S3 HELPERS
+# CRAWL PARALELO POR FECHAS
 # ==========================
-def s3_client():
-    return boto3.client("s3")
+def date_shards(fecha_desde, fecha_hasta, n_shards):
+    """Parte [fecha_desde, fecha_hasta] en n_shards rangos contiguos sin solaparse."""
+    desde = dtparse(fecha_desde).date()
+    hasta = dtparse(fecha_hasta).date()
+    total_dias = (hasta - desde).days + 1
+    n_shards = max(1, min(n_shards, total_dias))
+    paso = total_dias / n_shards
+    shards = []
+    for i in range(n_shards):
+        ini = desde + timedelta(days=round(i * paso))
+        fin = desde + timedelta(days=round((i + 1) * paso) - 1)
+        shards.append((ini.isoformat(), fin.isoformat()))
+    return shards
+
+_WORKER_DRIVER = None
+
+def _init_worker(headless, slot_queue):
+    # Un driver por proceso, reutilizado por todos los shards que le toquen
+    global _WORKER_DRIVER
+    time.sleep(slot_queue.get() * ARRANQUE_ESCALONADO_SEG)
+    _WORKER_DRIVER = setup_driver(headless=headless)
+    multiprocessing.util.Finalize(None, _WORKER_DRIVER.quit, exitpriority=10)
+
+def _crawl_shard(texto, fecha_desde, fecha_hasta, max_paginas, pausa_seg):
+    return _recorrer_paginas(_WORKER_DRIVER, texto, fecha_desde, fecha_hasta,
+                             max_paginas, pausa_seg)
+
+def dedup_rows(rows):
+    """Dedup por (titulo, link), conservando el primer resultado."""
+    seen = set()
+    clean = []
+    for r in rows:
+        k = (r.get("titulo","").strip(), r.get("link","").strip())
+        if k in seen: continue
+        seen.add(k)
+        clean.append(r)
+    return clean
+
+def iter_shards_paralelo(texto=None, fecha_desde="2018-01-01", fecha_hasta="2025-12-31",
+                         max_paginas=5, headless=True, pausa_seg=0.8,
+                         workers=4, n_shards=None):
+    """
+    Reparte el rango de fechas en shards que recorre un pool de procesos
+    (un Chrome por proceso). Rinde (indice_shard, filas) a medida que terminan.
+    max_paginas aplica a cada shard. workers se recorta a MAX_CHROME_WORKERS.
+    """
+    workers = max(1, min(workers, MAX_CHROME_WORKERS))
+    shards = date_shards(fecha_desde, fecha_hasta, n_shards or workers * 2)
+    print(f"Crawl paralelo: {len(shards)} shards en {workers} workers")
+
+    # "spawn" y no fork: run() ya tiene hilos de subida corriendo (urllib3/SSL/sqlite);
+    # forkear mientras alguno tiene un lock tomado puede colgar a los workers de Chrome
+    mp_ctx = multiprocessing.get_context("spawn")
+    # Cola con el orden de arranque de cada worker (escalonado)
+    t0 = time.time()
+    with mp_ctx.Manager() as manager:
+        slot_queue = manager.Queue()
+        for i in range(workers):
+            slot_queue.put(i)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_ctx,
+                                 initializer=_init_worker,
+                                 initargs=(headless, slot_queue)) as pool:
+            futures = {
+                pool.submit(_crawl_shard, texto, desde, hasta, max_paginas, pausa_seg): i
+                for i, (desde, hasta) in enumerate(shards)
+            }
+            for fut in as_completed(futures):
+                i = futures[fut]
+                desde, hasta = shards[i]
+                try:
+                    rows = fut.result()
+                    print(f"   [{desde} → {hasta}] {len(rows)} resultados")
+                except Exception as e:
+                    print(f"[WARN] Shard {desde} → {hasta} falló: {e}")
+                    rows = []
+                yield i, rows
+    print(f"Crawl paralelo terminado en {time.time() - t0:.1f}s")
+
+def buscar_laboral_pba_paralelo(texto=None, fecha_desde="2018-01-01", fecha_hasta="2025-12-31",
+                                max_paginas=5, headless=True, pausa_seg=0.8,
+                                workers=4, n_shards=None):
+    """
+    Igual que buscar_laboral_pba pero repartiendo el rango de fechas en shards
+    (ver iter_shards_paralelo).
+    """
+    por_shard = dict(iter_shards_paralelo(texto, fecha_desde, fecha_hasta, max_paginas,
+                                          headless, pausa_seg, workers, n_shards))
+    # Merge en orden cronológico de shards para que la salida sea reproducible
+    data = [row for i in sorted(por_shard) for row in por_shard[i]]
+    return dedup_rows(data)
 
+# ==========================
+# S3 HELPERS
+# ==========================
 def sha256_id(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:16]
 
@@ -233,40 +395,17 @@ def safe_filename_from_url(url: str) -> str:
         return ""
     return name
 
-def download_bytes(url: str):
-    try:
-        r = requests.get(url, timeout=REQUESTS_TIMEOUT, allow_redirects=True)
-        r.raise_for_status()
-        ct = r.headers.get("Content-Type", "")
-        return r.content, ct
-    except requests.RequestException:
-        return None, None
-
 def s3_put_bytes(key: str, data: bytes, content_type: str = None, metadata: dict = None):
-    cli = s3_client()
-    extra = {
-        "Bucket": S3_BUCKET_NAME,
-        "Key": key,
-        "Body": data,
-        "ServerSideEncryption": "AES256",
-    }
-    if content_type:
-        extra["ContentType"] = content_type
-    if metadata:
-        extra["Metadata"] = {str(k): str(v) for k, v in metadata.items()}
-    cli.put_object(**extra)
-    return f"s3://{S3_BUCKET_NAME}/{key}"
+    return put_bytes(S3_BUCKET_NAME, key, data, content_type=content_type, metadata=metadata)
+
+def s3_put_stream(key: str, chunks, content_type: str = None, metadata: dict = None):
+    return upload_stream(S3_BUCKET_NAME, key, chunks,
+                         content_type=content_type, metadata=metadata)
 
 # ==========================
 # PIPE: scrape -> upload
 # ==========================
-def upload_result_and_document(row: dict):
-    """
-    Sube:
-      - metadata.json (siempre)
-      - documento (si se pudo descargar)
-    Retorna claves S3 subidas.
-    """
+def result_folder(row: dict):
     # ID estable
     base_id = sha256_id(f"{row.get('titulo','')}|{row.get('link','')}")
     # Año para organizar (si no hay fecha, usa 'sin-fecha')
@@ -279,82 +418,309 @@ def upload_result_and_document(row: dict):
         pass
 
     titulo_slug = slugify(row.get("titulo","")[:60]) or "sin-titulo"
-    folder = f"{S3_PREFIX_BASE}/{year}/{base_id}-{titulo_slug}"
+    return base_id, f"{S3_PREFIX_BASE}/{year}/{base_id}-{titulo_slug}"
 
-    # 1) Subir metadata.json
+def blob_key(sha256: str, ext: str = "") -> str:
+    # Layout direccionado por contenido: el mismo documento se guarda una sola vez
+    return f"{S3_BLOB_PREFIX}/{sha256[:2]}/{sha256}{ext}"
+
+def put_blob(fh, sha: str, size: int, content_type: str, link: str, blobs=None):
+    """
+    Sube el documento (file object) bajo su SHA-256 si el índice local no lo conoce.
+    Usa multipart en streaming, así la memoria no depende del tamaño del documento.
+    Si otro hilo está subiendo el mismo SHA, espera a que termine (BlobIndex.reclamar),
+    así metadata.json nunca se escribe antes de que exista el objeto.
+    Retorna la referencia que va en metadata.json y si se subió.
+    """
+    name = safe_filename_from_url(link)
+    ext = os.path.splitext(name)[1] if name else ""
+    ext = ext or guess_ext_from_ct(content_type) or (".pdf" if ".pdf" in link.lower() else ".html")
+    ct = content_type or mimetypes.guess_type(f"x{ext}")[0] or "application/octet-stream"
+    key = blob_key(sha, ext)
+    nuevo = True
+    if blobs:
+        key, nuevo = blobs.reclamar(sha, key, size, ct)
+    if nuevo:
+        try:
+            s3_put_stream(key, iter_file(fh), content_type=ct, metadata={"sha256": sha})
+        except BaseException:
+            if blobs: blobs.liberar(sha, size)
+            raise
+        # Recién ahora el blob cuenta como subido (los que esperaban este SHA siguen)
+        if blobs: blobs.confirmar(sha)
+    ref = {"sha256": sha, "s3_key": key, "content_type": ct, "size_bytes": size}
+    return ref, nuevo
+
+def casi_duplicado(d, link: str, casi_dups):
+    """
+    Gate de casi-duplicados: calcula la firma MinHash del documento descargado,
+    leyendo del archivo temporal de la descarga solo las primeras páginas y sin caché.
+    Si ya hay uno casi idéntico devuelve su {doc_id, similitud, ref}; si no, lo
+    registra y devuelve None. Si no se puede extraer texto, no se filtra.
+    """
+    try:
+        sig = firma(texto_documento(d.file, d.content_type, link))
+    except Exception:
+        sig = None
+    finally:
+        d.file.seek(0)
+    if sig is None:
+        return None
+    return casi_dups.registrar(d.sha256, sig)
+
+def upload_result_and_document(row: dict, downloader, state=None, blobs=None,
+                               revalidar=False, casi_dups=None):
+    """
+    Sube:
+      - documento como blob bajo su SHA-256 (si se pudo descargar y no estaba ya)
+      - metadata.json con la referencia al blob
+    downloader: Downloader de la corrida (sesión y límites por host compartidos).
+    state: CrawlState; saltea items completos y retoma los que quedaron a medias.
+    blobs: BlobIndex; detecta documentos repetidos antes de subirlos.
+    revalidar: con state, hace GET condicional (ETag/Last-Modified) de los completos.
+    casi_dups: NearDupIndex; si el documento es casi idéntico a uno ya subido no se
+    guarda, y metadata.json apunta al blob existente.
+    Retorna claves S3, si el item se salteó y si era casi duplicado.
+    """
+    base_id, folder = result_folder(row)
+    prev = state.get(base_id) if state else None
     meta_key = f"{folder}/metadata.json"
-    meta_bytes = json.dumps(row, ensure_ascii=False, indent=2).encode("utf-8")
-    s3_put_bytes(meta_key, meta_bytes, content_type="application/json; charset=utf-8")
-
-    uploaded = {"metadata_key": meta_key, "document_key": None}
-
-    # 2) Descargar documento (si link parece válido)
-    link = row.get("link") or ""
-    if link.startswith("http"):
-        data, ct = download_bytes(link)
-        if data:
-            # Nombre amigable
-            name = safe_filename_from_url(link)
-            if not name:
-                ext = guess_ext_from_ct(ct) or (".pdf" if ".pdf" in link.lower() else ".html")
-                name = f"documento{ext}"
-            doc_key = f"{folder}/{name}"
-            s3_put_bytes(doc_key, data, content_type=(ct or mimetypes.guess_type(name)[0] or "application/octet-stream"))
-            uploaded["document_key"] = doc_key
-
-    return uploaded
-
-def save_manifest_to_s3(rows: list, prefix: str):
+    uploaded = {"metadata_key": meta_key,
+                "document_key": prev["document_key"] if prev else None,
+                "skipped": False,
+                "casi_duplicado": False}
+
+    if prev and prev["status"] == COMPLETO and not revalidar:
+        uploaded["skipped"] = True
+        return uploaded
+
+    try:
+        # 1) Descargar documento (si link parece válido) y subirlo como blob
+        link = row.get("link") or ""
+        ref = None
+        d = None
+        if link.startswith("http"):
+            completo = prev and prev["status"] == COMPLETO
+            d = downloader.fetch(
+                link,
+                etag=prev["etag"] if completo else None,
+                last_modified=prev["last_modified"] if completo else None,
+                stream=True)
+            try:
+                if d.status == 304 or (completo and d.file and prev["content_sha256"] == d.sha256):
+                    uploaded["skipped"] = True
+                    if state: state.update(base_id, etag=d.etag, last_modified=d.last_modified, error=None)
+                    return uploaded
+                if completo and not d.file:
+                    # Falló la revalidación: el metadata.json y el estado que había siguen valiendo
+                    uploaded["skipped"] = True
+                    return uploaded
+                if d.file:
+                    casi = casi_duplicado(d, link, casi_dups) if casi_dups else None
+                    if casi and casi["ref"]:
+                        ref = {**casi["ref"], "casi_duplicado_de": casi["doc_id"],
+                               "similitud": casi["similitud"], "sha256_descargado": d.sha256}
+                        uploaded["casi_duplicado"] = True
+                    else:
+                        try:
+                            ref, _ = put_blob(d.file, d.sha256, d.size, d.content_type, link, blobs)
+                        except Exception:
+                            if casi_dups and casi is None: casi_dups.olvidar(d.sha256)
+                            raise
+                        if casi_dups and casi is None: casi_dups.actualizar_ref(d.sha256, ref)
+                    uploaded["document_key"] = ref["s3_key"]
+            finally:
+                if d.file: d.file.close()
+
+        # 2) Subir metadata.json apuntando al blob
+        meta = dict(row)
+        meta["documento"] = ref
+        meta_bytes = json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")
+        s3_put_bytes(meta_key, meta_bytes, content_type="application/json; charset=utf-8")
+
+        if state:
+            # Sin documento descargado queda en METADATA: la próxima corrida lo reintenta
+            status = METADATA if link.startswith("http") and not ref else COMPLETO
+            state.update(base_id, titulo=row.get("titulo",""), link=link, status=status,
+                         metadata_key=meta_key, document_key=uploaded["document_key"],
+                         content_sha256=d.sha256 if ref else None,
+                         etag=d.etag if ref else None,
+                         last_modified=d.last_modified if ref else None, error=None)
+        return uploaded
+    except Exception as e:
+        if state: state.update(base_id, status=ERROR, error=str(e)[:500])
+        raise
+
+def save_manifest_to_s3(rows: list, prefix: str, resumen: dict = None):
     ts = pd.Timestamp.utcnow().strftime("%Y%m%dT%H%M%SZ")
     # CSV
     df = pd.DataFrame(rows)
     csv_buf = io.StringIO()
     df.to_csv(csv_buf, index=False, encoding="utf-8")
     csv_key = f"{prefix}/manifest_{ts}.csv"
-    s3_put_bytes(csv_key, csv_buf.getvalue().encode("utf-8"), content_type="text/csv; charset=utf-8")
     # JSON
     json_key = f"{prefix}/manifest_{ts}.json"
-    s3_put_bytes(json_key, json.dumps(rows, ensure_ascii=False, indent=2).encode("utf-8"),
-                 content_type="application/json; charset=utf-8")
+    manifest = {"generated_at": ts, "resumen": resumen or {}, "entries": rows}
+    resultados = put_many(S3_BUCKET_NAME, [
+        {"key": csv_key, "data": csv_buf.getvalue().encode("utf-8"),
+         "content_type": "text/csv; charset=utf-8"},
+        {"key": json_key, "data": json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+         "content_type": "application/json; charset=utf-8"},
+    ])
+    for r in resultados:
+        if r["error"]:
+            raise RuntimeError(f"No se pudo subir {r['key']}: {r['error']}")
     return csv_key, json_key
 
-def run(texto="despido con causa", fecha_desde="2018-01-01", fecha_hasta="2025-12-31",
-        max_paginas=3, headless=True):
-    print("Buscando jurisprudencia Laboral – PBA…")
-    resultados = buscar_laboral_pba(
-        texto=texto,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        max_paginas=max_paginas,
-        headless=headless
-    )
-    print(f"Resultados: {len(resultados)}")
+def iter_paginas_resultados(texto, fecha_desde, fecha_hasta, max_paginas, headless,
+                            workers=1, backend="selenium"):
+    """
+    Fuente de páginas de resultados según backend; Selenium queda de fallback.
+    Los backends no comparten estado: el link del backend HTTP lo arma _doc_link
+    ({base}/{friendly-url}/{uuid}) y no hay garantía de que coincida con el href
+    de la card de Selenium. Como el id del item es sha256_id(titulo|link), pasar
+    de un backend al otro (o caer a Selenium a mitad de corrida) puede dar ids
+    nuevos para los mismos fallos: se vuelven a procesar y subir bajo otra carpeta.
+    """
+    if backend == "http":
+        try:
+            yield from iter_paginas_http(
+                texto=texto,
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                max_paginas=max_paginas
+            )
+            return
+        except (requests.RequestException, ValueError) as e:
+            # Si el endpoint cambia o falla, seguimos con el navegador. Las filas
+            # ya emitidas solo se descartan por el dedup del pipeline si el link
+            # de Selenium es idéntico al de HTTP; si no, se procesan de nuevo.
+            print(f"[WARN] Backend HTTP falló ({e}); usando Selenium")
+    if workers > 1:
+        for _, rows in iter_shards_paralelo(
+                texto=texto,
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                max_paginas=max_paginas,
+                headless=headless,
+                workers=workers):
+            yield rows
+    else:
+        yield from iter_paginas_selenium(
+            texto=texto,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            max_paginas=max_paginas,
+            headless=headless
+        )
 
-    # Dedup por (titulo, link)
-    seen = set()
-    clean = []
-    for r in resultados:
-        k = (r.get("titulo","").strip(), r.get("link","").strip())
-        if k in seen: continue
-        seen.add(k)
-        clean.append(r)
+_FIN = object()
 
-    # Subir cada caso
-    uploaded_records = []
-    for row in clean:
+def _consumidor(cola, downloader, state, blobs, casi_dups, revalidar, uploaded_records,
+                contadores, lock):
+    # Descarga + subida de cada fila que deja el scraper en la cola
+    while True:
+        item = cola.get()
         try:
-            up = upload_result_and_document(row)
+            if item is _FIN:
+                return
+            i, row = item
+            up = upload_result_and_document(row, downloader=downloader, state=state,
+                                            blobs=blobs, revalidar=revalidar, casi_dups=casi_dups)
             row["_s3_metadata_key"] = up["metadata_key"]
             row["_s3_document_key"] = up["document_key"]
-            uploaded_records.append(row)
-            time.sleep(0.2)  # cuida al sitio y al S3
+            with lock:
+                uploaded_records.append((i, row))
+                contadores["salteados" if up["skipped"] else "subidos"] += 1
+                if up["casi_duplicado"]:
+                    contadores["casi_duplicados"] += 1
         except ClientError as ce:
             print(f"[S3] Error subiendo: {ce}")
         except Exception as e:
             print(f"[WARN] Falla con un item: {e}")
+        finally:
+            cola.task_done()
+
+def run(texto="despido con causa", fecha_desde="2018-01-01", fecha_hasta="2025-12-31",
+        max_paginas=3, headless=True, workers=1, backend="selenium",
+        upload_workers=DOWNLOAD_CONCURRENCY, incremental=True, revalidar=False,
+        casi_duplicados=False):
+    """
+    Pipeline scrape -> descarga/subida: el scraper deja las filas de cada página en una
+    cola acotada (PIPELINE_MAX_PENDIENTES) que consumen upload_workers hilos mientras
+    se carga la página siguiente. Si la cola se llena, el scraper espera (backpressure).
+    incremental: usa el estado local (CRAWL_STATE_PATH) para no volver a subir lo completo.
+    revalidar: además revisa con GET condicional si los documentos completos cambiaron.
+    casi_duplicados: no guarda documentos casi idénticos (MinHash, CASI_DUP_UMBRAL) a uno ya subido.
+    backend: "selenium" o "http". El estado incremental es por backend (ver
+    iter_paginas_resultados): conviene no alternarlos sobre el mismo CRAWL_STATE_PATH.
+    """
+    print("Buscando jurisprudencia Laboral – PBA…")
+    t0 = time.perf_counter()
+    downloader = Downloader(concurrency=upload_workers,
+                            rate_per_host=DOWNLOAD_RATE_PER_HOST,
+                            timeout=REQUESTS_TIMEOUT)
+    state = CrawlState(CRAWL_STATE_PATH) if incremental else None
+    blobs = BlobIndex(CRAWL_STATE_PATH)
+    casi_dups = NearDupIndex(CRAWL_STATE_PATH, umbral=CASI_DUP_UMBRAL) if casi_duplicados else None
+    cola = queue.Queue(maxsize=PIPELINE_MAX_PENDIENTES)
+    uploaded_records = []
+    contadores = {"subidos": 0, "salteados": 0, "casi_duplicados": 0}
+    lock = threading.Lock()
+    consumidores = [
+        threading.Thread(target=_consumidor,
+                         args=(cola, downloader, state, blobs, casi_dups, revalidar,
+                               uploaded_records, contadores, lock),
+                         daemon=True)
+        for _ in range(upload_workers)
+    ]
+    for th in consumidores:
+        th.start()
+
+    # Productor: dedup por (titulo, link) a medida que llegan las páginas
+    seen = set()
+    n_resultados = 0
+    try:
+        for rows in iter_paginas_resultados(texto, fecha_desde, fecha_hasta, max_paginas,
+                                            headless, workers, backend):
+            for r in rows:
+                k = (r.get("titulo","").strip(), r.get("link","").strip())
+                if k in seen: continue
+                seen.add(k)
+                cola.put((n_resultados, r))
+                n_resultados += 1
+    finally:
+        t_scrape = time.perf_counter() - t0
+        for _ in consumidores:
+            cola.put(_FIN)
+        for th in consumidores:
+            th.join()
+        downloader.close()
+        if state: state.close()
+        blobs.close()
+        if casi_dups: casi_dups.close()
+    print(f"Resultados: {n_resultados} ({contadores['subidos']} subidos, "
+          f"{contadores['salteados']} ya estaban al día, "
+          f"{contadores['casi_duplicados']} casi duplicados sin guardar)")
+
+    uploaded_records = [row for _, row in sorted(uploaded_records, key=lambda x: x[0])]
+
+    stats = downloader.report()
+    print(f"Descargas: {stats['docs']} docs, {stats['bytes'] / 1e6:.1f} MB, "
+          f"{stats['no_modificados']} sin cambios (304), {stats['errores']} errores en {stats['segundos']:.1f}s → "
+          f"{stats['docs_por_seg']:.2f} docs/s, {stats['bytes_por_seg'] / 1e6:.2f} MB/s")
+    print(f"Tiempo: scraping {t_scrape:.1f}s, total {time.perf_counter() - t0:.1f}s")
+
+    dedup = blobs.resumen()
+    ratio = f"{dedup['dedup_ratio']:.2f}x" if dedup["dedup_ratio"] else "n/a"
+    print(f"Dedup: {dedup['documentos_referenciados']} documentos → {dedup['blobs_nuevos']} blobs nuevos "
+          f"({dedup['blobs_reusados']} reusados, ratio {ratio}, "
+          f"{dedup['bytes_subidos'] / 1e6:.1f} de {dedup['bytes_referenciados'] / 1e6:.1f} MB subidos)")
 
     # Subir manifiesto global
-    manifest_csv, manifest_json = save_manifest_to_s3(uploaded_records, f"{S3_PREFIX_BASE}/manifiestos")
+    resumen = {"resultados": n_resultados, **contadores, "dedup": dedup}
+    manifest_csv, manifest_json = save_manifest_to_s3(uploaded_records, f"{S3_PREFIX_BASE}/manifiestos",
+                                                      resumen=resumen)
     print(f"Subidos manifiestos: s3://{S3_BUCKET_NAME}/{manifest_csv} , s3://{S3_BUCKET_NAME}/{manifest_json}")
     return uploaded_records
 
@@ -364,5 +730,7 @@ if __name__ == "__main__":
         fecha_desde="2018-01-01",
         fecha_hasta="2025-12-31",
         max_paginas=4,
-        headless=True
+        headless=True,
+        workers=1,          # >1 activa el crawl paralelo por rangos de fechas
+        backend="selenium"  # "http" evita el navegador (Selenium queda de fallback)
     )
@@ -0,0 +1,102 @@
+"""
+Benchmark de consultas BM25: índice en disco (mmap) vs. BM25 por fuerza bruta
+La fuerza bruta recorre todos los documentos ya tokenizados en memoria; sirve
+para verificar que el índice devuelve el mismo top-k y para ver la diferencia
+de latencia.
+
+Uso:
+    python bench_bm25.py [--chunks data/chunks] [--index data/bm25] [-k 10] [--repeticiones 20]
+"""
+
+import argparse
+import heapq
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from bm25_index import BM25Index, bm25_idf, build_index, iter_documentos, tokenize, TERMS_NAME
+
+CONSULTAS = [
+    "indemnización por despido sin justa causa",
+    "incapacidad inhabilidad del trabajador",
+    "accidente de trabajo comisión médica",
+    "asociaciones sindicales tutela de delegados",
+    "plazo para contestar la demanda",
+    "prueba pericial contable",
+    "jornada de trabajo horas extras",
+    "preaviso integración mes de despido",
+    "recurso extraordinario federal",
+    "convenio colectivo de comercio",
+]
+
+
+def bm25_fuerza_bruta(docs_tokens, query, k, k1, b):
+    n = len(docs_tokens)
+    avgdl = sum(len(t) for t in docs_tokens) / n
+    terms = set(tokenize(query))
+    tfs = [Counter(t) for t in docs_tokens]
+    df = {term: sum(1 for c in tfs if term in c) for term in terms}
+    scores = []
+    for doc_num, (tokens, c) in enumerate(zip(docs_tokens, tfs)):
+        s = 0.0
+        for term in terms:
+            tf = c.get(term, 0)
+            if tf:
+                s += bm25_idf(n, df[term]) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avgdl))
+        if s:
+            scores.append((s, doc_num))
+    return heapq.nlargest(k, scores)
+
+
+def percentiles(tiempos):
+    tiempos = sorted(tiempos)
+    return statistics.mean(tiempos), tiempos[len(tiempos) // 2], tiempos[int(0.95 * (len(tiempos) - 1))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", default="rag_fulltexts.jsonl")
+    ap.add_argument("--chunks", default="data/chunks")
+    ap.add_argument("--index", default="data/bm25")
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--repeticiones", type=int, default=20)
+    args = ap.parse_args()
+
+    chunks = args.chunks if (Path(args.chunks) / "manifest.json").exists() else None
+    if not (Path(args.index) / TERMS_NAME).exists():
+        print("🔧 Construyendo índice...")
+        build_index(iter_documentos(args.src, chunks), args.index)
+
+    print("⏱️  BENCHMARK BM25")
+    print("=" * 70)
+    t0 = time.perf_counter()
+    index = BM25Index(args.index)
+    print(f"Carga del índice: {(time.perf_counter() - t0) * 1000:.1f} ms ({len(index)} documentos)")
+
+    tiempos = []
+    for _ in range(args.repeticiones):
+        for q in CONSULTAS:
+            t0 = time.perf_counter()
+            index.search(q, args.k)
+            tiempos.append(time.perf_counter() - t0)
+    media, p50, p95 = percentiles(tiempos)
+    print(f"Índice mmap   : media {media * 1000:7.2f} ms | p50 {p50 * 1000:7.2f} ms | p95 {p95 * 1000:7.2f} ms")
+
+    # Fuerza bruta (una pasada por consulta) y verificación del top-k
+    docs_tokens = [tokenize(d.get("text") or "") for d in iter_documentos(args.src, chunks)]
+    tiempos = []
+    for q in CONSULTAS:
+        t0 = time.perf_counter()
+        esperado = bm25_fuerza_bruta(docs_tokens, q, args.k, index.k1, index.b)
+        tiempos.append(time.perf_counter() - t0)
+        obtenido = index.search(q, args.k)
+        assert [round(s, 6) for s, _ in esperado] == [round(s, 6) for s, _ in obtenido], q
+    media_fb, _, _ = percentiles(tiempos)
+    print(f"Fuerza bruta  : media {media_fb * 1000:7.2f} ms | {media_fb / media:.0f}x más lento")
+    print("✓ Mismo top-k en todas las consultas")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
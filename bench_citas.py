@@ -0,0 +1,70 @@
+"""
+Benchmark del extractor de citas: throughput (MB/s) y escalado con el largo del documento
+Arma documentos sintéticos de N páginas (~3000 caracteres por página) con texto
+real del corpus y citas intercaladas. Si el extractor es lineal, el MB/s se
+mantiene constante al crecer el documento.
+
+Uso:
+    python bench_citas.py [--paginas 100 400 1600] [--repeticiones 3]
+"""
+
+import argparse
+import json
+import time
+
+from citas import extraer_citas, CorpusResolver
+
+CHARS_POR_PAGINA = 3000
+CITAS_EJEMPLO = (
+    "conforme art. 245 LCT y arts. 232, 233 y 245 de la Ley de Contrato de Trabajo, "
+    "art. 58 Ley 18.345, arts. 71 a 73 L.O., Ley N° 24.557, Decreto 1169/96 y CCT 130/75, "
+    "art 245 LCT y arts 14 y 15 CN. "
+)
+
+
+def documento_sintetico(paginas, corpus="rag_fulltexts.jsonl"):
+    textos = []
+    with open(corpus, "r", encoding="utf-8") as fh:
+        for line in fh:
+            texto = json.loads(line).get("text") or ""
+            if texto:
+                textos.append(texto)
+    base = "\n".join(textos)
+    partes = []
+    total = 0
+    objetivo = paginas * CHARS_POR_PAGINA
+    inicio = 0
+    while total < objetivo:
+        pagina = base[inicio:inicio + CHARS_POR_PAGINA] + "\n" + CITAS_EJEMPLO
+        inicio = (inicio + CHARS_POR_PAGINA) % max(1, len(base) - CHARS_POR_PAGINA)
+        partes.append(pagina)
+        total += len(pagina)
+    return "".join(partes)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paginas", type=int, nargs="+", default=[100, 400, 1600])
+    ap.add_argument("--repeticiones", type=int, default=3)
+    args = ap.parse_args()
+
+    resolver = CorpusResolver()
+    print("⏱️  BENCHMARK EXTRACTOR DE CITAS")
+    print("=" * 70)
+    for paginas in args.paginas:
+        texto = documento_sintetico(paginas)
+        mb = len(texto.encode("utf-8")) / 1e6
+        mejor = float("inf")
+        for _ in range(args.repeticiones):
+            t0 = time.perf_counter()
+            citas = extraer_citas(texto)
+            mejor = min(mejor, time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        resueltas = sum(1 for c in citas if resolver.resolver(c))
+        t_resolver = time.perf_counter() - t0
+        print(f"{paginas:5d} páginas ({mb:6.2f} MB): {mejor * 1000:8.1f} ms | {mb / mejor:6.1f} MB/s | "
+              f"{len(citas)} citas ({resueltas} resueltas en {t_resolver * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de lookup por id: CorpusStore (mmap + índice) vs. recorrido lineal del JSONL
+
+Uso:
+    python bench_corpus_store.py [--src rag_fulltexts.jsonl] [--store data/corpus_store] [--repeticiones 50]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from corpus_store import CorpusStore, build_store, INDEX_NAME
+
+
+def lookup_lineal(src, record_id):
+    """Lo que hace hoy un consumidor: parsear línea por línea hasta encontrar el id."""
+    with open(src, "r", encoding="utf-8") as fh:
+        for line in fh:
+            rec = json.loads(line)
+            if rec.get("id") == record_id:
+                return rec
+    return None
+
+
+def medir(fn, ids, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        for record_id in ids:
+            t0 = time.perf_counter()
+            fn(record_id)
+            tiempos.append(time.perf_counter() - t0)
+    tiempos.sort()
+    return statistics.mean(tiempos), tiempos[len(tiempos) // 2], tiempos[int(0.95 * (len(tiempos) - 1))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", default="rag_fulltexts.jsonl")
+    ap.add_argument("--store", default="data/corpus_store")
+    ap.add_argument("--repeticiones", type=int, default=50)
+    args = ap.parse_args()
+
+    if not (Path(args.store) / INDEX_NAME).exists():
+        print("🔧 Construyendo store...")
+        build_store(args.src, args.store)
+
+    print("⏱️  BENCHMARK LOOKUP POR ID")
+    print("=" * 70)
+    with CorpusStore(args.store) as store:
+        ids = list(store.records)
+        # Mismo resultado en ambos caminos
+        for record_id in ids:
+            assert store.get(record_id) == lookup_lineal(args.src, record_id), record_id
+
+        casos = [
+            ("JSONL lineal (registro)", lambda i: lookup_lineal(args.src, i)),
+            ("store.get (registro)", store.get),
+            ("store.metadata (sin texto)", store.metadata),
+        ]
+        print(f"{len(ids)} ids × {args.repeticiones} repeticiones\n")
+        base = None
+        for nombre, fn in casos:
+            media, p50, p95 = medir(fn, ids, args.repeticiones)
+            base = base or media
+            print(f"{nombre:28s}: media {media * 1e6:10.1f} µs | p50 {p50 * 1e6:10.1f} µs | "
+                  f"p95 {p95 * 1e6:10.1f} µs | {base / media:7.1f}x")
+
+        print(f"\nEjemplo: LCT-245 → {store.metadata('LCT-245')['title'] if 'LCT-245' in store else 'n/a'}")
+
+
+if __name__ == "__main__":
+    main()
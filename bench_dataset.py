@@ -0,0 +1,115 @@
+"""
+Benchmark de carga del dataset de entrenamiento: CSV vs. Parquet
+Mide lo que hace entrenar_clasificador.py al arrancar (leer train y test con
+texto + etapa): tiempo y memoria retenida (RSS) de cada método, cada uno en un
+proceso nuevo para que no se contaminen entre sí.
+Con --replicas el dataset se replica N veces para simular un corpus más grande
+(en cada réplica se barajan las palabras de cada texto, para que la compresión
+no aproveche documentos idénticos).
+
+Uso:
+    python bench_dataset.py [--replicas 200] [--repeticiones 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import dataset_procesado
+from dataset_procesado import cargar_split, guardar_dataset, PROCESSED_DIR
+
+METODOS = ["csv", "parquet", "parquet_mmap"]
+
+
+def cargar(metodo, base):
+    base = Path(base)
+    if metodo == "csv":
+        return [pd.read_csv(base / f"{s}.csv") for s in ("train", "test")]
+    mmap = metodo == "parquet_mmap"
+    return [cargar_split(s, path=base / "dataset.parquet", memory_map=mmap) for s in ("train", "test")]
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _medir_en_proceso(metodo, base):
+    """Se ejecuta en el subproceso: imprime segundos y RSS retenido (MB) por los DataFrames."""
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    dfs = cargar(metodo, base)
+    dt = time.perf_counter() - t0
+    print(dt, _rss_mb() - rss0, sum(len(df) for df in dfs))
+
+
+def preparar(base, replicas):
+    """Escribe train/test CSV y dataset.parquet replicados en `base`."""
+    train = pd.read_csv(PROCESSED_DIR / "train.csv")
+    test = pd.read_csv(PROCESSED_DIR / "test.csv")
+    rng = random.Random(42)
+
+    def replicar(df):
+        partes = [df]
+        for _ in range(replicas - 1):
+            copia = df.copy()
+            copia["texto"] = [" ".join(rng.sample(t.split(), len(t.split()))) for t in df["texto"]]
+            partes.append(copia)
+        return pd.concat(partes, ignore_index=True)
+
+    train = replicar(train)
+    test = replicar(test)
+    train.to_csv(base / "train.csv", index=False)
+    test.to_csv(base / "test.csv", index=False)
+    train["filename"] = ""
+    test["filename"] = ""
+    guardar_dataset(train, test, base / "dataset.parquet")
+    return len(train) + len(test)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--replicas", type=int, default=1, help="Replicar el dataset N veces")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--medir", nargs=2, metavar=("METODO", "DIR"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.medir:
+        _medir_en_proceso(*args.medir)
+        return
+    if not dataset_procesado.parquet_disponible():
+        print("❌ Falta pyarrow: pip install pyarrow")
+        return
+    if not (PROCESSED_DIR / "train.csv").exists():
+        print("❌ No hay dataset. Primero: python preparar_datos.py")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        filas = preparar(base, args.replicas)
+        tam = {"csv": sum((base / f"{s}.csv").stat().st_size for s in ("train", "test")),
+               "parquet": (base / "dataset.parquet").stat().st_size}
+        print(f"📊 {filas} documentos | CSV {tam['csv'] / 1e6:.1f} MB | Parquet {tam['parquet'] / 1e6:.1f} MB")
+
+        for metodo in METODOS:
+            tiempos, memorias = [], []
+            for _ in range(args.repeticiones):
+                out = subprocess.run([sys.executable, __file__, "--medir", metodo, tmp],
+                                     capture_output=True, text=True, check=True).stdout.split()
+                tiempos.append(float(out[0]))
+                memorias.append(float(out[1]))
+                assert int(out[2]) == filas
+            print(f"   {metodo:13s}: {statistics.median(tiempos) * 1000:8.1f} ms  "
+                  f"+{statistics.median(memorias):7.1f} MB RSS")
+
+
+if __name__ == "__main__":
+    main()
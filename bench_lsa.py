@@ -0,0 +1,99 @@
+"""
+Benchmark del índice LSA: top-k por bloques (memmap + argpartition) vs. fuerza bruta
+La fuerza bruta carga la matriz entera, calcula todos los scores y ordena.
+Se mide latencia y recall@k del top-k por bloques contra ese resultado exacto.
+Con --replicas la matriz se replica (con un poco de ruido) para simular un
+corpus más grande.
+
+Uso:
+    python bench_lsa.py [--index data/lsa] [-k 10] [--replicas 20] [--block-rows 65536]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from lsa_index import LSAIndex, top_k, MODEL_NAME
+from bench_bm25 import CONSULTAS
+
+
+def fuerza_bruta(emb, q, k):
+    scores = np.asarray(emb) @ q
+    orden = np.argsort(-scores)[:k]
+    return orden, scores[orden]
+
+
+def medir(fn, consultas, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        for q in consultas:
+            t0 = time.perf_counter()
+            fn(q)
+            tiempos.append(time.perf_counter() - t0)
+    tiempos.sort()
+    return statistics.mean(tiempos), tiempos[len(tiempos) // 2], tiempos[int(0.95 * (len(tiempos) - 1))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--index", default="data/lsa")
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--replicas", type=int, default=1, help="Replicar la matriz N veces")
+    ap.add_argument("--block-rows", type=int, default=65536)
+    ap.add_argument("--repeticiones", type=int, default=10)
+    args = ap.parse_args()
+
+    if not (Path(args.index) / MODEL_NAME).exists():
+        print("❌ No hay índice. Primero: python lsa_index.py fit")
+        return
+
+    index = LSAIndex(args.index, block_rows=args.block_rows)
+    emb = index.emb
+    tmp = None
+    if args.replicas > 1:
+        rng = np.random.default_rng(42)
+        tmp = tempfile.NamedTemporaryFile(suffix=".f32")
+        for _ in range(args.replicas):
+            ruido = rng.normal(0, 0.01, emb.shape).astype(np.float32)
+            (np.asarray(emb) + ruido).tofile(tmp)
+        tmp.flush()
+        emb = np.memmap(tmp.name, dtype=np.float32, mode="r",
+                        shape=(emb.shape[0] * args.replicas, emb.shape[1]))
+
+    print("⏱️  BENCHMARK LSA TOP-K")
+    print("=" * 70)
+    print(f"Matriz: {emb.shape[0]} × {emb.shape[1]} float32 ({emb.nbytes / 1e6:.0f} MB) | k={args.k}\n")
+
+    t0 = time.perf_counter()
+    vectores = [index.embed(q) for q in CONSULTAS]
+    print(f"Proyección de consulta: {(time.perf_counter() - t0) / len(CONSULTAS) * 1000:.2f} ms/consulta")
+
+    # Con chunks duplicados hay empates: se compara por score, no por fila
+    aciertos = 0
+    for q in vectores:
+        _, scores = top_k(emb, q, args.k, args.block_rows)
+        _, exactos = fuerza_bruta(emb, q, args.k)
+        aciertos += int((scores >= exactos[-1] - 1e-6).sum())
+    recall = aciertos / (args.k * len(vectores))
+
+    casos = [
+        ("Fuerza bruta (argsort)", lambda q: fuerza_bruta(emb, q, args.k)),
+        ("Bloques + argpartition", lambda q: top_k(emb, q, args.k, args.block_rows)),
+    ]
+    base = None
+    for nombre, fn in casos:
+        media, p50, p95 = medir(fn, vectores, args.repeticiones)
+        base = base or media
+        print(f"{nombre:24s}: media {media * 1000:8.2f} ms | p50 {p50 * 1000:8.2f} ms | "
+              f"p95 {p95 * 1000:8.2f} ms | {base / media:5.1f}x")
+    print(f"\nRecall@{args.k} vs. fuerza bruta: {recall:.3f}")
+    if tmp:
+        tmp.close()
+
+
+if __name__ == "__main__":
+    main()
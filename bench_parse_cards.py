@@ -0,0 +1,87 @@
+"""
+Benchmark de extracción de cards de SAIJ
+Compara _parse_cards_webdriver (varias llamadas por card) contra
+_parse_cards_js (un solo execute_script) sobre una página de resultados
+SINTÉTICA (data/fixtures/saij_resultados.html): mide tiempos, no que el HTML
+real de SAIJ coincida con los selectores.
+
+Uso:
+    python bench_parse_cards.py [--fixture data/fixtures/saij_resultados.html] [--repeticiones 20]
+"""
+
+import argparse
+import importlib.util
+import statistics
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def cargar_build_library():
+    """Importa 1_build_library.py (el nombre empieza con dígito, no se puede usar import)."""
+    spec = importlib.util.spec_from_file_location("build_library", BASE_DIR / "1_build_library.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def contar_round_trips(driver):
+    """Envuelve driver.execute para contar los comandos enviados a chromedriver."""
+    contador = {"n": 0}
+    original = driver.execute
+
+    def execute(*args, **kwargs):
+        contador["n"] += 1
+        return original(*args, **kwargs)
+
+    driver.execute = execute
+    return contador
+
+
+def medir(fn, driver, contador, repeticiones):
+    tiempos = []
+    rows = None
+    contador["n"] = 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        rows = fn(driver)
+        tiempos.append(time.perf_counter() - t0)
+    return rows, tiempos, contador["n"] / repeticiones
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixture", default=str(BASE_DIR / "data/fixtures/saij_resultados.html"))
+    ap.add_argument("--repeticiones", type=int, default=20)
+    ap.add_argument("--no-headless", action="store_true")
+    args = ap.parse_args()
+
+    lib = cargar_build_library()
+    driver = lib.setup_driver(headless=not args.no_headless)
+    try:
+        driver.get(Path(args.fixture).resolve().as_uri())
+        lib.wait_body(driver)
+        contador = contar_round_trips(driver)
+
+        print("⏱️  BENCHMARK _parse_cards")
+        print("=" * 60)
+        resultados = {}
+        for nombre, fn in [("webdriver", lib._parse_cards_webdriver),
+                           ("execute_script", lib._parse_cards_js)]:
+            rows, tiempos, trips = medir(fn, driver, contador, args.repeticiones)
+            resultados[nombre] = rows
+            print(f"{nombre:15s}: {len(rows):3d} cards | "
+                  f"media {statistics.mean(tiempos) * 1000:8.1f} ms | "
+                  f"p95 {sorted(tiempos)[int(0.95 * (len(tiempos) - 1))] * 1000:8.1f} ms | "
+                  f"{trips:.0f} round trips")
+
+        iguales = resultados["webdriver"] == resultados["execute_script"]
+        print("-" * 60)
+        print(f"Mismas filas en ambos caminos: {'✓' if iguales else '✗'}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Índice invertido BM25 en disco sobre el corpus RAG
+Indexa los chunks de corpus_chunks.py (o los registros enteros de
+rag_fulltexts.jsonl) y guarda:
+  - bm25.terms.json: término → [offset, largo en bytes, df]
+  - bm25.postings.bin: por término, pares (doc, tf) con doc en delta, en varint
+  - bm25.docs.json: ids/metadata mínima de cada documento y su largo en tokens
+En consulta el archivo de postings se abre con mmap y solo se decodifican las
+listas de los términos de la consulta.
+
+La normalización es la misma que usa el TfidfVectorizer de
+entrenar_clasificador.py (strip_accents='unicode', lowercase, token_pattern
+por defecto), así "indemnización" e "INDEMNIZACION" son el mismo término.
+
+Uso:
+    python bm25_index.py build [--chunks data/chunks | --src rag_fulltexts.jsonl] [--out data/bm25]
+    python bm25_index.py search "despido sin causa indemnización" [-k 10]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+K1 = 1.2
+B = 0.75
+TERMS_NAME = "bm25.terms.json"
+POSTINGS_NAME = "bm25.postings.bin"
+DOCS_NAME = "bm25.docs.json"
+CAMPOS_DOC = ("id", "parent_id", "article", "title", "type")
+MAX_TERMINOS_DOC = 32       # términos por documento en search_document
+
+# Igual que el token_pattern por defecto de sklearn
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+def strip_accents(text):
+    """Mismo algoritmo que sklearn strip_accents_unicode (NFKD sin marcas combinantes)."""
+    try:
+        text.encode("ascii")
+        return text
+    except UnicodeEncodeError:
+        pass
+    nfkd = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(strip_accents(text.lower()))
+
+
+def _varint(n, out):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _decode_postings(buf):
+    """Rinde (doc, tf) desde un buffer de varints (doc en delta)."""
+    valores = []
+    n = shift = 0
+    for byte in buf:
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            valores.append(n)
+            n = shift = 0
+    doc = 0
+    for i in range(0, len(valores), 2):
+        doc += valores[i]
+        yield doc, valores[i + 1]
+
+
+def bm25_idf(n, df):
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def iter_documentos(src=None, chunks_dir=None):
+    """Rinde dicts con `text` desde el store de chunks o desde el JSONL del corpus."""
+    if chunks_dir:
+        from corpus_chunks import iter_chunks
+        for chunk in iter_chunks(chunks_dir):
+            yield {**chunk, "id": chunk["chunk_id"]}
+        return
+    with open(src, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_index(docs, out_dir):
+    """Construye el índice a partir de un iterable de dicts con `id` y `text`."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    postings = {}
+    meta = []
+    lens = []
+    for doc_num, doc in enumerate(docs):
+        tokens = tokenize(doc.get("text") or "")
+        lens.append(len(tokens))
+        meta.append({campo: doc.get(campo) for campo in CAMPOS_DOC})
+        for term, tf in Counter(tokens).items():
+            postings.setdefault(term, []).append((doc_num, tf))
+
+    terms = {}
+    offset = 0
+    with open(out_dir / POSTINGS_NAME, "wb") as fh:
+        for term in sorted(postings):
+            buf = bytearray()
+            previo = 0
+            for doc_num, tf in postings[term]:
+                _varint(doc_num - previo, buf)
+                _varint(tf, buf)
+                previo = doc_num
+            fh.write(buf)
+            terms[term] = [offset, len(buf), len(postings[term])]
+            offset += len(buf)
+
+    with open(out_dir / TERMS_NAME, "w", encoding="utf-8") as fh:
+        json.dump(terms, fh, ensure_ascii=False)
+    with open(out_dir / DOCS_NAME, "w", encoding="utf-8") as fh:
+        json.dump({"k1": K1, "b": B, "docs": meta, "lens": lens}, fh, ensure_ascii=False)
+    return {"docs": len(meta), "terms": len(terms), "postings_bytes": offset}
+
+
+class BM25Index:
+    """Índice cargado para consultas. Abrirlo una vez y reutilizarlo."""
+
+    def __init__(self, index_dir):
+        index_dir = Path(index_dir)
+        with open(index_dir / TERMS_NAME, "r", encoding="utf-8") as fh:
+            self.terms = json.load(fh)
+        with open(index_dir / DOCS_NAME, "r", encoding="utf-8") as fh:
+            info = json.load(fh)
+        self.docs = info["docs"]
+        self.k1 = info["k1"]
+        self.b = info["b"]
+        self.n = len(self.docs)
+        avgdl = (sum(info["lens"]) / self.n) if self.n else 1.0
+        # Parte de la normalización por largo que depende solo del documento
+        self._norm = [self.k1 * (1 - self.b + self.b * dl / avgdl) for dl in info["lens"]]
+        self._fh = open(index_dir / POSTINGS_NAME, "rb")
+        size = (index_dir / POSTINGS_NAME).stat().st_size
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return self.n
+
+    def search(self, query, k=10):
+        """Top-k como lista de (score, doc) ordenada de mayor a menor."""
+        return self._top_k(set(tokenize(query)), k)
+
+    def search_document(self, text, k=10, max_terms=MAX_TERMINOS_DOC):
+        """
+        Top-k para un documento largo usado como consulta (p. ej. el texto de un PDF).
+        Solo se consultan sus max_terms términos de mayor tf·idf, así el costo no
+        depende del largo del documento.
+        """
+        conteo = Counter(tokenize(text))
+        pesos = {}
+        for term, tf in conteo.items():
+            entrada = self.terms.get(term)
+            if entrada is not None:
+                pesos[term] = (1 + math.log(tf)) * bm25_idf(self.n, entrada[2])
+        return self._top_k(heapq.nlargest(max_terms, pesos, key=pesos.get), k)
+
+    def _top_k(self, terms, k):
+        scores = {}
+        k1 = self.k1
+        norm = self._norm
+        for term in terms:
+            entrada = self.terms.get(term)
+            if entrada is None:
+                continue
+            offset, largo, df = entrada
+            idf = bm25_idf(self.n, df)
+            for doc_num, tf in _decode_postings(self._mm[offset:offset + largo]):
+                scores[doc_num] = scores.get(doc_num, 0.0) + idf * tf * (k1 + 1) / (tf + norm[doc_num])
+        top = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+        return [(score, self.docs[doc_num]) for doc_num, score in top]
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Construir el índice")
+    b.add_argument("--src", default="rag_fulltexts.jsonl")
+    b.add_argument("--chunks", default=None, help="Indexar el store de chunks en lugar de registros")
+    b.add_argument("--out", default="data/bm25")
+    s = sub.add_parser("search", help="Consultar el índice")
+    s.add_argument("query")
+    s.add_argument("-k", type=int, default=10)
+    s.add_argument("--index", default="data/bm25")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        r = build_index(iter_documentos(args.src, args.chunks), args.out)
+        print(f"✓ {r['docs']} documentos, {r['terms']} términos, "
+              f"postings {r['postings_bytes'] / 1024:.0f} KB → {args.out}")
+        return
+
+    with BM25Index(args.index) as index:
+        for score, doc in index.search(args.query, args.k):
+            art = f" art. {doc['article']}" if doc.get("article") else ""
+            print(f"{score:7.2f}  {doc['id']}{art} — {doc.get('title') or ''}")
+
+
+if __name__ == "__main__":
+    main()
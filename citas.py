@@ -0,0 +1,292 @@
+"""
+Extractor de citas normativas e índice inverso norma → documentos
+Reconoce en una sola pasada (una regex compilada con alternativas) citas como
+"art. 245 LCT", "arts. 232, 233 y 245 de la Ley de Contrato de Trabajo",
+"art 245 LCT", "arts 14 y 15 de la Constitución Nacional" (sin punto),
+"art. 58 Ley 18.345", "art. 14 bis de la Constitución Nacional", "Ley 20.744",
+"Decreto 1169/96", "CCT 130/75" o "Acordada CSJN 31/2020", y las normaliza a
+ids con el formato del corpus RAG: LCT-245, L18345-58, CN-14bis, L20744,
+DEC-1169-96, CCT-130-75, AC-CSJN-31-2020.
+
+Con el corpus cargado (CorpusResolver) cada cita se resuelve además al registro
+de rag_fulltexts.jsonl que la contiene (ej. art. 80 LO → L18345-78-89).
+
+El índice inverso se guarda en data/citas/index.json y es incremental: solo se
+re-procesan los documentos cuyo sha256 cambió.
+
+Uso:
+    python citas.py index [--dir data/raw --dir data/library] [--out data/citas]
+    python citas.py buscar LCT-245
+    python citas.py extraer documento.pdf
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from pdf_texto import extract_pages
+
+INDEX_NAME = "index.json"
+EXTENSIONES = (".pdf", ".html", ".htm", ".txt")
+MAX_RANGO = 50              # "arts. 71 a 73" se expande; rangos más largos no
+
+Cita = namedtuple("Cita", "id norma articulo inicio fin")
+
+# Prefijo de los ids por artículo cuando no es L<número> (la LCT es la Ley 20.744)
+PREFIJO_ARTICULO = {"L20744": "LCT"}
+
+_NUM = r"(?:n(?:ro|°|º|o)?\.?\s*)?"
+
+
+def _normas(p):
+    """Alternativas de norma citable después de un artículo; `p` evita nombres repetidos."""
+    return (
+        rf"(?P<{p}lct>(?-i:LCT)\b|L\.\s?C\.\s?T\.?|ley\s+de\s+contrato\s+de\s+trabajo)"
+        rf"|(?P<{p}lo>L\.\s?O\.|ley\s+de\s+organizaci[oó]n\s+y\s+procedimiento"
+        rf"(?:\s+de\s+la\s+justicia\s+nacional\s+del\s+trabajo)?)"
+        rf"|(?P<{p}cpccn>(?-i:CPCCN)\b|C\.\s?P\.\s?C\.\s?C\.\s?N\.?"
+        rf"|c[oó]d(?:igo|\.)\s+procesal\s+civil\s+y\s+comercial(?:\s+de\s+la\s+naci[oó]n)?)"
+        rf"|(?P<{p}cn>(?-i:CN)\b|C\.\s?N\.|constituci[oó]n\s+nacional)"
+        rf"|ley\s*{_NUM}(?P<{p}ley>\d{{1,2}}\.?\d{{3}})\b"
+    )
+
+
+_ARTICULOS = (
+    r"\bart(?:[ií]culos?|s?\.?)\s*"
+    r"(?P<arts>\d+\s*[°º]?(?:\s*(?:bis|ter|qu[aá]ter)\b)?"
+    r"(?:\s*(?:,|\by\b|\be\b|\bal?\b)\s*\d+\s*[°º]?(?:\s*(?:bis|ter|qu[aá]ter)\b)?)*)"
+    r"(?:[,\s]+inc(?:isos?|s?\.)\s*[\w)]+(?:\s*(?:,|\by\b)\s*[\w)]+)*)?"
+    r"[,\s]*(?:(?:de|del)\s+)?(?:(?:la|el)\s+)?"
+)
+
+# Todas las alternativas empiezan en borde de palabra con a/c/d/l: el lookahead
+# descarta rápido el resto de las posiciones (~3x más rápido en textos largos)
+CITA_RE = re.compile(
+    rf"\b(?=[acdl])(?:{_ARTICULOS}(?:{_normas('a_')})"
+    rf"|{_normas('n_')}"
+    rf"|\b(?:decreto|dec\.|dto\.)\s*{_NUM}(?P<dec>\d+)/(?P<dec_anio>\d{{2,4}})\b"
+    rf"|\b(?:(?-i:CCT)|C\.C\.T\.|convenio\s+colectivo(?:\s+de\s+trabajo)?)\s*{_NUM}"
+    rf"(?P<cct>\d+)/(?P<cct_anio>\d{{2,4}})\b"
+    rf"|\bacordada\s*(?:(?-i:CSJN)\s*)?{_NUM}(?P<ac>\d+)/(?P<ac_anio>\d{{4}})\b)",
+    re.IGNORECASE,
+)
+
+_ART_RE = re.compile(r"(\d+)\s*[°º]?\s*(bis|ter|qu[aá]ter)?|(\bal?\b)", re.IGNORECASE)
+
+
+def _norma_id(m, p):
+    if m.group(p + "lct"):
+        return "L20744"
+    if m.group(p + "lo"):
+        return "L18345"
+    if m.group(p + "cpccn"):
+        return "CPCCN"
+    if m.group(p + "cn"):
+        return "CN"
+    if m.group(p + "ley"):
+        return "L" + m.group(p + "ley").replace(".", "")
+    return None
+
+
+def _anio_corto(anio):
+    return anio[-2:]
+
+
+def _articulos(texto):
+    """'232, 233 y 245' → ['232', '233', '245']; '71 a 73' → ['71', '72', '73']; '14 bis' → ['14bis']."""
+    arts = []
+    rango = False
+    for m in _ART_RE.finditer(texto):
+        if m.group(3):
+            rango = True
+            continue
+        numero = int(m.group(1))
+        sufijo = (m.group(2) or "").lower().replace("á", "a")
+        if rango and arts and not sufijo and arts[-1].isdigit():
+            desde = int(arts[-1])
+            if 0 < numero - desde <= MAX_RANGO:
+                arts.extend(str(n) for n in range(desde + 1, numero + 1))
+                rango = False
+                continue
+        arts.append(f"{numero}{sufijo}")
+        rango = False
+    return arts
+
+
+def cita_id(norma, articulo=None):
+    if not articulo:
+        return norma
+    return f"{PREFIJO_ARTICULO.get(norma, norma)}-{articulo}"
+
+
+def extraer_citas(texto):
+    """Lista de Cita en orden de aparición. Tiempo lineal en el largo del texto."""
+    citas = []
+    for m in CITA_RE.finditer(texto):
+        if m.group("arts") is not None:
+            norma = _norma_id(m, "a_")
+            for articulo in _articulos(m.group("arts")):
+                citas.append(Cita(cita_id(norma, articulo), norma, articulo, m.start(), m.end()))
+            continue
+        norma = _norma_id(m, "n_")
+        if norma is None:
+            if m.group("dec"):
+                norma = f"DEC-{m.group('dec')}-{_anio_corto(m.group('dec_anio'))}"
+            elif m.group("cct"):
+                norma = f"CCT-{m.group('cct')}-{_anio_corto(m.group('cct_anio'))}"
+            else:
+                norma = f"AC-CSJN-{m.group('ac')}-{m.group('ac_anio')}"
+        citas.append(Cita(norma, norma, None, m.start(), m.end()))
+    return citas
+
+
+class CorpusResolver:
+    """Resuelve ids de cita a registros de rag_fulltexts.jsonl usando su article_range."""
+
+    def __init__(self, corpus_path="rag_fulltexts.jsonl"):
+        self.por_articulo = {}   # prefijo → [(desde, hasta, sufijo, id)]
+        self.por_norma = {}      # L20744 → LCT-20744, L24557 → L24557, ...
+        with open(corpus_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                rec_id = rec["id"]
+                rango = rec.get("article_range")
+                if not rango:
+                    # "LCT-20744" es el texto completo de la Ley 20.744
+                    m = re.fullmatch(r"[A-Z]+-(\d{4,5})", rec_id)
+                    self.por_norma[f"L{m.group(1)}" if m else rec_id] = rec_id
+                    continue
+                prefijo = rec_id.split("-")[0]
+                m = re.match(r"(\d+)\s*(?:-\s*(\d+))?\s*(bis|ter)?", rango)
+                desde = int(m.group(1))
+                hasta = int(m.group(2) or desde)
+                self.por_articulo.setdefault(prefijo, []).append((desde, hasta, m.group(3) or "", rec_id))
+        # El más específico (rango más chico) primero
+        for candidatos in self.por_articulo.values():
+            candidatos.sort(key=lambda c: c[1] - c[0])
+
+    def resolver(self, cita):
+        """Id del registro del corpus que contiene la cita, o None."""
+        if cita.articulo:
+            m = re.match(r"(\d+)(\D*)", cita.articulo)
+            numero, sufijo = int(m.group(1)), m.group(2)
+            prefijo = PREFIJO_ARTICULO.get(cita.norma, cita.norma)
+            for desde, hasta, suf, rec_id in self.por_articulo.get(prefijo, []):
+                if desde <= numero <= hasta and (suf == sufijo or desde != hasta):
+                    return rec_id
+        return self.por_norma.get(cita.norma)
+
+
+def _texto_documento(path):
+    path = Path(path)
+    if path.suffix.lower() == ".pdf":
+        return "\n".join(extract_pages(path))
+    texto = path.read_text(encoding="utf-8", errors="ignore")
+    if path.suffix.lower() in (".html", ".htm"):
+        texto = re.sub(r"<[^>]+>", " ", texto)
+    return texto
+
+
+def resumen_citas(texto, resolver=None):
+    """Conteos por id de cita, por norma y (si hay resolver) por registro del corpus."""
+    citas = extraer_citas(texto)
+    resumen = {
+        "citas": dict(Counter(c.id for c in citas)),
+        "normas": dict(Counter(c.norma for c in citas)),
+    }
+    if resolver is not None:
+        resumen["corpus"] = dict(Counter(r for r in map(resolver.resolver, citas) if r))
+    return resumen
+
+
+def build_index(dirs, out_dir, corpus_path="rag_fulltexts.jsonl"):
+    """
+    Actualiza el índice inverso con los documentos de `dirs` (recursivo).
+    Devuelve {documentos, procesados, sin_cambios, errores}.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / INDEX_NAME
+    previo = {}
+    if index_path.exists():
+        with open(index_path, "r", encoding="utf-8") as fh:
+            previo = json.load(fh).get("documentos", {})
+    resolver = CorpusResolver(corpus_path) if Path(corpus_path).exists() else None
+
+    documentos = {}
+    procesados = errores = 0
+    for base in dirs:
+        for path in sorted(Path(base).rglob("*")):
+            if path.suffix.lower() not in EXTENSIONES or not path.is_file():
+                continue
+            ruta = path.as_posix()
+            sha = hashlib.sha256(path.read_bytes()).hexdigest()
+            if ruta in previo and previo[ruta]["sha256"] == sha:
+                documentos[ruta] = previo[ruta]
+                continue
+            try:
+                documentos[ruta] = {"sha256": sha, **resumen_citas(_texto_documento(path), resolver)}
+                procesados += 1
+            except Exception as e:
+                print(f"⚠️  {ruta}: {e}")
+                errores += 1
+
+    por_norma = {}
+    for ruta, doc in documentos.items():
+        for campo in ("citas", "normas", "corpus"):
+            for norma, n in doc.get(campo, {}).items():
+                destino = por_norma.setdefault(norma, {})
+                destino[ruta] = max(destino.get(ruta, 0), n)
+
+    with open(index_path, "w", encoding="utf-8") as fh:
+        json.dump({"documentos": documentos, "por_norma": por_norma}, fh, ensure_ascii=False, indent=1)
+    return {"documentos": len(documentos), "procesados": procesados,
+            "sin_cambios": len(documentos) - procesados, "errores": errores}
+
+
+def documentos_que_citan(norma, index_dir="data/citas"):
+    """{ruta: cantidad de citas} de los documentos que citan `norma` (id de cita, norma o corpus)."""
+    with open(Path(index_dir) / INDEX_NAME, "r", encoding="utf-8") as fh:
+        return json.load(fh)["por_norma"].get(norma, {})
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    i = sub.add_parser("index", help="Construir/actualizar el índice inverso")
+    i.add_argument("--dir", action="append", default=None,
+                   help="Carpeta a indexar (repetible). Default: data/raw y data/library si existe")
+    i.add_argument("--out", default="data/citas")
+    i.add_argument("--corpus", default="rag_fulltexts.jsonl")
+    b = sub.add_parser("buscar", help="Documentos que citan una norma")
+    b.add_argument("norma")
+    b.add_argument("--index", default="data/citas")
+    e = sub.add_parser("extraer", help="Citas de un documento")
+    e.add_argument("path")
+    e.add_argument("--corpus", default="rag_fulltexts.jsonl")
+    args = ap.parse_args()
+
+    if args.cmd == "index":
+        dirs = args.dir or [d for d in ("data/raw", "data/library") if Path(d).exists()]
+        r = build_index(dirs, args.out, args.corpus)
+        print(f"✓ {r['documentos']} documentos indexados → {args.out}")
+        print(f"   procesados: {r['procesados']} | sin cambios: {r['sin_cambios']} | errores: {r['errores']}")
+    elif args.cmd == "buscar":
+        docs = documentos_que_citan(args.norma, args.index)
+        print(f"📚 {len(docs)} documentos citan {args.norma}")
+        for ruta, n in sorted(docs.items(), key=lambda kv: -kv[1]):
+            print(f"   {n:4d}  {ruta}")
+    else:
+        resolver = CorpusResolver(args.corpus) if Path(args.corpus).exists() else None
+        for cita in extraer_citas(_texto_documento(args.path)):
+            destino = resolver.resolver(cita) if resolver else None
+            print(f"   {cita.id:18s} → {destino or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Chunks por artículo del corpus RAG
+Parte cada registro de rag_fulltexts.jsonl en sus artículos ("Artículo 245.-",
+"Art. 254. —", "ARTICULO 1°", ...). Si un registro no tiene artículos (fallos,
+acordadas) o un artículo es demasiado largo, se corta en ventanas de tamaño
+acotado con solapamiento. Cada chunk lleva la metadata del registro padre más
+el número de artículo.
+
+El store es incremental: un JSONL por registro en <out>/records/ y un manifest
+con el sha256 de cada registro. En cada corrida solo se re-chunkean los
+registros nuevos o cambiados y se borran los que ya no están en el corpus.
+
+Uso:
+    python corpus_chunks.py rag_fulltexts.jsonl --out data/chunks
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+MAX_CHUNK_CHARS = 4000      # chunks más largos se parten en ventanas
+OVERLAP_CHARS = 400         # solapamiento entre ventanas consecutivas
+MANIFEST_NAME = "manifest.json"
+RECORDS_DIR = "records"
+
+# Encabezado de artículo al inicio de línea, seguido de separador o fin de línea.
+# Mayúscula inicial obligatoria: "artículo 245 de esta ley" en minúscula es una cita.
+ARTICULO_RE = re.compile(
+    r"^[ \t]*(?:ART[IÍ]CULO|Art[ií]culo|ART\.|Art\.)[ \t]*"
+    r"(?P<numero>\d+)[ \t]*[°º]?[ \t]*"
+    r"(?P<sufijo>(?i:bis|ter|qu[aá]ter|quinquies|quinter))?"
+    r"(?=[ \t]*(?:[.:\-\x96\x97–—]|$))",
+    re.MULTILINE,
+)
+
+
+def _params(max_chars, overlap):
+    return {"max_chars": max_chars, "overlap": overlap}
+
+
+def iter_articulos(text):
+    """Rinde (articulo, inicio, fin). El texto antes del primer artículo va con articulo None."""
+    marcas = list(ARTICULO_RE.finditer(text))
+    if not marcas:
+        yield None, 0, len(text)
+        return
+    if text[:marcas[0].start()].strip():
+        yield None, 0, marcas[0].start()
+    for i, m in enumerate(marcas):
+        fin = marcas[i + 1].start() if i + 1 < len(marcas) else len(text)
+        articulo = m.group("numero")
+        if m.group("sufijo"):
+            articulo += " " + m.group("sufijo").lower()
+        yield articulo, m.start(), fin
+
+
+def iter_ventanas(inicio, fin, text, max_chars=MAX_CHUNK_CHARS, overlap=OVERLAP_CHARS):
+    """Rinde rangos (inicio, fin) de hasta max_chars, cortando en un espacio si se puede."""
+    pos = inicio
+    while pos < fin:
+        corte = min(pos + max_chars, fin)
+        if corte < fin:
+            espacio = text.rfind(" ", pos + max_chars // 2, corte)
+            if espacio == -1:
+                espacio = text.rfind("\n", pos + max_chars // 2, corte)
+            if espacio != -1:
+                corte = espacio
+        yield pos, corte
+        if corte >= fin:
+            return
+        pos = max(corte - overlap, pos + 1)
+
+
+def chunk_record(rec, max_chars=MAX_CHUNK_CHARS, overlap=OVERLAP_CHARS):
+    """Lista de chunks de un registro. Cada chunk es la metadata del padre + campos del chunk."""
+    text = rec.get("text") or ""
+    padre = {k: v for k, v in rec.items() if k != "text"}
+    chunks = []
+    for articulo, a_ini, a_fin in iter_articulos(text):
+        for inicio, fin in iter_ventanas(a_ini, a_fin, text, max_chars, overlap):
+            fragmento = text[inicio:fin].strip()
+            if not fragmento:
+                continue
+            chunks.append({
+                **padre,
+                "chunk_id": f"{rec['id']}#{len(chunks):04d}",
+                "parent_id": rec["id"],
+                "article": articulo,
+                "chunk_index": len(chunks),
+                "char_start": inicio,
+                "char_end": fin,
+                "text": fragmento,
+            })
+    return chunks
+
+
+def _record_file(record_id):
+    return re.sub(r"[^\w.-]", "_", record_id) + ".jsonl"
+
+
+def build_chunks(src, out_dir, max_chars=MAX_CHUNK_CHARS, overlap=OVERLAP_CHARS):
+    """
+    Actualiza el store de chunks en out_dir. Lee el corpus línea a línea.
+    Devuelve un resumen {records, chunks, rechunked, unchanged, removed}.
+    """
+    out_dir = Path(out_dir)
+    rec_dir = out_dir / RECORDS_DIR
+    rec_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    previo = {}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as fh:
+            viejo = json.load(fh)
+        # Si cambian los parámetros de corte, todo se re-chunkea
+        if viejo.get("params") == _params(max_chars, overlap):
+            previo = viejo.get("records", {})
+
+    registros = {}
+    rechunked = 0
+    with open(src, "rb") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            sha = hashlib.sha256(line.rstrip(b"\r\n")).hexdigest()
+            rec = json.loads(line)
+            record_id = rec["id"]
+            entrada = previo.get(record_id)
+            if entrada and entrada["sha256"] == sha and (rec_dir / entrada["file"]).exists():
+                registros[record_id] = entrada
+                continue
+            chunks = chunk_record(rec, max_chars, overlap)
+            nombre = _record_file(record_id)
+            tmp = rec_dir / (nombre + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as out:
+                for chunk in chunks:
+                    out.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+            tmp.replace(rec_dir / nombre)
+            registros[record_id] = {"sha256": sha, "file": nombre, "chunks": len(chunks)}
+            rechunked += 1
+
+    vigentes = {e["file"] for e in registros.values()}
+    removed = 0
+    for viejo in rec_dir.glob("*.jsonl"):
+        if viejo.name not in vigentes:
+            viejo.unlink()
+            removed += 1
+
+    manifest = {
+        "source": Path(src).name,
+        "params": _params(max_chars, overlap),
+        "records": registros,
+        "total_chunks": sum(e["chunks"] for e in registros.values()),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=1)
+    return {
+        "records": len(registros),
+        "chunks": manifest["total_chunks"],
+        "rechunked": rechunked,
+        "unchanged": len(registros) - rechunked,
+        "removed": removed,
+    }
+
+
+def iter_chunks(out_dir):
+    """Rinde todos los chunks del store, en el orden del corpus."""
+    out_dir = Path(out_dir)
+    with open(out_dir / MANIFEST_NAME, "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    for entrada in manifest["records"].values():
+        with open(out_dir / RECORDS_DIR / entrada["file"], "r", encoding="utf-8") as fh:
+            for line in fh:
+                yield json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", nargs="?", default="rag_fulltexts.jsonl")
+    ap.add_argument("--out", default="data/chunks", help="Carpeta del store de chunks")
+    ap.add_argument("--max-chars", type=int, default=MAX_CHUNK_CHARS)
+    ap.add_argument("--overlap", type=int, default=OVERLAP_CHARS)
+    args = ap.parse_args()
+
+    r = build_chunks(args.src, args.out, args.max_chars, args.overlap)
+    print(f"✓ {r['records']} registros → {r['chunks']} chunks en {args.out}")
+    print(f"   re-chunkeados: {r['rechunked']} | sin cambios: {r['unchanged']} | borrados: {r['removed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Export del corpus RAG en shards de tamaño acotado
+Parte rag_fulltexts.jsonl en archivos JSONL de hasta --max-mb cada uno (un registro
+más grande que el límite va solo en su shard) y escribe un manifest con, por shard,
+los ids de registro, su rango de bytes dentro del shard y el sha256 del shard.
+Así los indexadores pueden procesar shards en paralelo y refrescar solo los que cambian.
+
+Uso:
+    python corpus_shards.py rag_fulltexts.jsonl --out data/shards --max-mb 1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MAX_SHARD_BYTES = 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+
+
+class _Shard:
+    def __init__(self, out_dir, stem, numero):
+        self.name = f"{stem}-{numero:05d}.jsonl"
+        self.path = Path(out_dir) / self.name
+        self.fh = open(self.path, "wb")
+        self.sha = hashlib.sha256()
+        self.bytes = 0
+        self.records = []
+
+    def add(self, record_id, line):
+        self.records.append({"id": record_id, "offset": self.bytes, "length": len(line)})
+        self.fh.write(line)
+        self.sha.update(line)
+        self.bytes += len(line)
+
+    def close(self):
+        self.fh.close()
+        return {
+            "file": self.name,
+            "bytes": self.bytes,
+            "sha256": self.sha.hexdigest(),
+            "records": self.records,
+        }
+
+
+def _record_id(line, numero_linea):
+    try:
+        return json.loads(line).get("id") or f"linea-{numero_linea}"
+    except ValueError:
+        return f"linea-{numero_linea}"
+
+
+def export_shards(src, out_dir, max_bytes=MAX_SHARD_BYTES):
+    """
+    Escribe los shards en out_dir (borrando shards viejos del mismo corpus)
+    y devuelve el manifest. Lee el JSONL línea a línea: la memoria no depende
+    del tamaño del corpus.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(src).stem
+    for viejo in out_dir.glob(f"{stem}-*.jsonl"):
+        viejo.unlink()
+
+    shards = []
+    actual = None
+    with open(src, "rb") as fh:
+        for numero_linea, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            if actual and actual.bytes and actual.bytes + len(line) > max_bytes:
+                shards.append(actual.close())
+                actual = None
+            if actual is None:
+                actual = _Shard(out_dir, stem, len(shards))
+            actual.add(_record_id(line, numero_linea), line)
+    if actual:
+        shards.append(actual.close())
+
+    manifest = {
+        "source": os.path.basename(src),
+        "max_shard_bytes": max_bytes,
+        "shards": shards,
+        "total_records": sum(len(s["records"]) for s in shards),
+    }
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def read_record(shard_dir, shard, record):
+    """Lee un registro puntual usando su rango de bytes del manifest."""
+    with open(Path(shard_dir) / shard["file"], "rb") as fh:
+        fh.seek(record["offset"])
+        return json.loads(fh.read(record["length"]))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", nargs="?", default="rag_fulltexts.jsonl")
+    ap.add_argument("--out", default="data/shards", help="Carpeta de salida")
+    ap.add_argument("--max-mb", type=float, default=MAX_SHARD_BYTES / (1024 * 1024),
+                    help="Tamaño máximo por shard en MB")
+    args = ap.parse_args()
+
+    manifest = export_shards(args.src, args.out, int(args.max_mb * 1024 * 1024))
+    print(f"✓ {manifest['total_records']} registros en {len(manifest['shards'])} shards → {args.out}")
+    for s in manifest["shards"]:
+        print(f"   {s['file']}: {len(s['records'])} registros, {s['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Store binario del corpus RAG con acceso aleatorio
+Convierte rag_fulltexts.jsonl en:
+  - corpus.dat: por registro, su metadata (JSON sin `text`) seguida del texto UTF-8
+  - corpus.idx.json: offsets por id y listas de ids por type, jurisdiction y priority_level
+El .dat se abre con mmap, así leer un registro (o solo su metadata) no decodifica
+el texto de ningún otro.
+
+Uso:
+    python corpus_store.py rag_fulltexts.jsonl --out data/corpus_store
+"""
+
+import argparse
+import json
+import mmap
+from pathlib import Path
+
+DATA_NAME = "corpus.dat"
+INDEX_NAME = "corpus.idx.json"
+CAMPOS_INDEXADOS = ("type", "jurisdiction", "priority_level")
+
+
+def build_store(src, out_dir):
+    """Convierte el JSONL al store. Devuelve la ruta de la carpeta."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    registros = {}
+    por_campo = {campo: {} for campo in CAMPOS_INDEXADOS}
+    offset = 0
+    with open(src, "r", encoding="utf-8") as fh, open(out_dir / DATA_NAME, "wb") as out:
+        for line in fh:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            text = (rec.pop("text", None) or "").encode("utf-8")
+            meta = json.dumps(rec, ensure_ascii=False).encode("utf-8")
+            out.write(meta)
+            out.write(text)
+            registros[rec["id"]] = [offset, len(meta), len(text)]
+            offset += len(meta) + len(text)
+            for campo in CAMPOS_INDEXADOS:
+                por_campo[campo].setdefault(str(rec.get(campo)), []).append(rec["id"])
+
+    index = {"source": Path(src).name, "records": registros, **por_campo}
+    with open(out_dir / INDEX_NAME, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, ensure_ascii=False)
+    return out_dir
+
+
+class CorpusStore:
+    """Lectura por id (registro, metadata o texto) y filtros por campos indexados."""
+
+    def __init__(self, store_dir):
+        store_dir = Path(store_dir)
+        with open(store_dir / INDEX_NAME, "r", encoding="utf-8") as fh:
+            self.index = json.load(fh)
+        self.records = self.index["records"]
+        self._fh = open(store_dir / DATA_NAME, "rb")
+        size = (store_dir / DATA_NAME).stat().st_size
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, record_id):
+        return record_id in self.records
+
+    def metadata(self, record_id):
+        """Metadata del registro sin leer su texto."""
+        offset, meta_len, _ = self.records[record_id]
+        return json.loads(self._mm[offset:offset + meta_len])
+
+    def text(self, record_id):
+        offset, meta_len, text_len = self.records[record_id]
+        start = offset + meta_len
+        return self._mm[start:start + text_len].decode("utf-8")
+
+    def get(self, record_id):
+        """Registro completo, igual al del JSONL original."""
+        rec = self.metadata(record_id)
+        rec["text"] = self.text(record_id)
+        return rec
+
+    def ids(self, **filtros):
+        """Ids que cumplen todos los filtros, ej. ids(type="norma", priority_level=1)."""
+        resultado = None
+        for campo, valor in filtros.items():
+            if campo not in CAMPOS_INDEXADOS:
+                raise KeyError(f"Campo no indexado: {campo}")
+            encontrados = self.index[campo].get(str(valor), [])
+            if resultado is None:
+                resultado = encontrados
+            else:
+                permitidos = set(encontrados)
+                resultado = [i for i in resultado if i in permitidos]
+        return list(self.records if resultado is None else resultado)
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", nargs="?", default="rag_fulltexts.jsonl")
+    ap.add_argument("--out", default="data/corpus_store", help="Carpeta del store")
+    args = ap.parse_args()
+
+    out = build_store(args.src, args.out)
+    with CorpusStore(out) as store:
+        print(f"✓ {len(store)} registros en {out}")
+        for campo in CAMPOS_INDEXADOS:
+            print(f"   {campo}: {len(store.index[campo])} valores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Estado local del crawl (SQLite)
+Registra por cada resultado (sha256_id(titulo|link)) qué se subió a S3, el hash
+del documento y los validadores HTTP (ETag / Last-Modified), para que una
+nueva corrida saltee lo ya completo, retome tras un corte y use GET condicional.
+También guarda el índice de blobs (documentos por contenido) para deduplicar.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# Estados posibles de un item
+PENDIENTE = "pendiente"   # visto en resultados, nada subido todavía
+METADATA = "metadata"     # metadata.json subido sin documento (falló la descarga)
+COMPLETO = "completo"     # blob + metadata.json (o no hay documento descargable)
+ERROR = "error"           # falló la última vez; se reintenta en la próxima corrida
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id             TEXT PRIMARY KEY,
+    titulo         TEXT,
+    link           TEXT,
+    status         TEXT NOT NULL,
+    metadata_key   TEXT,
+    document_key   TEXT,
+    content_sha256 TEXT,
+    etag           TEXT,
+    last_modified  TEXT,
+    error          TEXT,
+    updated_at     TEXT NOT NULL
+)
+"""
+
+_COLUMNAS = ("titulo", "link", "status", "metadata_key", "document_key",
+             "content_sha256", "etag", "last_modified", "error")
+
+
+class CrawlState:
+    """Acceso thread-safe a la base de estado (una conexión compartida con lock)."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(_SCHEMA)
+
+    def get(self, item_id):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, item_id, **campos):
+        """Inserta o actualiza las columnas dadas del item."""
+        desconocidas = set(campos) - set(_COLUMNAS)
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas: {sorted(desconocidas)}")
+        campos["updated_at"] = datetime.now(timezone.utc).isoformat()
+        # En el INSERT inicial el estado por defecto es PENDIENTE
+        insert = {"status": PENDIENTE, **campos}
+        cols = ", ".join(insert)
+        marcas = ", ".join("?" for _ in insert)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in campos)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO items (id, {cols}) VALUES (?, {marcas}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                (item_id, *insert.values()),
+            )
+
+    def resumen(self):
+        """Cantidad de items por estado."""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Estados de un blob
+BLOB_PENDIENTE = "pendiente"  # reclamado, subida en curso
+BLOB_SUBIDO = "subido"        # upload_stream terminó: el objeto existe en S3
+
+_SCHEMA_BLOBS = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256       TEXT PRIMARY KEY,
+    s3_key       TEXT NOT NULL,
+    size_bytes   INTEGER NOT NULL,
+    content_type TEXT,
+    estado       TEXT NOT NULL DEFAULT 'subido',
+    created_at   TEXT NOT NULL
+)
+"""
+
+
+class BlobIndex:
+    """
+    Índice local de blobs (documentos por SHA-256) ya subidos a S3.
+    Permite detectar duplicados antes de subir y lleva las métricas de dedup de la corrida.
+
+    Un blob reclamado queda PENDIENTE hasta que el llamador confirma la subida;
+    mientras tanto, otro hilo que reclama el mismo SHA espera, y si la subida
+    falla toma él el reclamo. Los pendientes que encuentra al abrir son de una
+    corrida que se cortó a mitad de subida: se descartan (se vuelven a subir).
+    Supone un solo proceso usando el índice a la vez, como run().
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.subida_terminada = threading.Condition(self.lock)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(_SCHEMA_BLOBS)
+            columnas = {r[1] for r in self.conn.execute("PRAGMA table_info(blobs)")}
+            if "estado" not in columnas:
+                # Bases anteriores: las filas existentes se toman como subidas
+                self.conn.execute(f"ALTER TABLE blobs ADD COLUMN estado TEXT NOT NULL DEFAULT '{BLOB_SUBIDO}'")
+            self.conn.execute("DELETE FROM blobs WHERE estado = ?", (BLOB_PENDIENTE,))
+        self.referenciados = 0
+        self.nuevos = 0
+        self.bytes_referenciados = 0
+        self.bytes_subidos = 0
+
+    def reclamar(self, sha256, s3_key, size_bytes, content_type=None):
+        """
+        Registra el blob si no existía. Devuelve (s3_key, nuevo): si nuevo es True
+        el llamador debe subirlo y después llamar a confirmar() (o a liberar() si
+        la subida falla). Si otro hilo lo está subiendo, espera a que termine.
+        """
+        with self.subida_terminada:
+            while True:
+                with self.conn:
+                    cur = self.conn.execute(
+                        "INSERT OR IGNORE INTO blobs (sha256, s3_key, size_bytes, content_type, estado, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (sha256, s3_key, size_bytes, content_type, BLOB_PENDIENTE,
+                         datetime.now(timezone.utc).isoformat()),
+                    )
+                nuevo = cur.rowcount == 1
+                if nuevo:
+                    break
+                fila = self.conn.execute("SELECT s3_key, estado FROM blobs WHERE sha256 = ?",
+                                         (sha256,)).fetchone()
+                if fila is not None and fila[1] == BLOB_SUBIDO:
+                    s3_key = fila[0]
+                    break
+                # Pendiente de otro hilo: esperar a confirmar() o liberar() y reintentar
+                self.subida_terminada.wait()
+            self.referenciados += 1
+            self.bytes_referenciados += size_bytes
+            if nuevo:
+                self.nuevos += 1
+                self.bytes_subidos += size_bytes
+        return s3_key, nuevo
+
+    def confirmar(self, sha256):
+        """Marca como subido un blob reclamado, después de que upload_stream terminó."""
+        with self.subida_terminada, self.conn:
+            self.conn.execute("UPDATE blobs SET estado = ? WHERE sha256 = ?", (BLOB_SUBIDO, sha256))
+            self.subida_terminada.notify_all()
+
+    def liberar(self, sha256, size_bytes):
+        """Deshace un reclamar() cuya subida falló."""
+        with self.subida_terminada, self.conn:
+            self.conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            self.referenciados -= 1
+            self.bytes_referenciados -= size_bytes
+            self.nuevos -= 1
+            self.bytes_subidos -= size_bytes
+            self.subida_terminada.notify_all()
+
+    def resumen(self):
+        """Métricas de dedup de la corrida actual."""
+        with self.lock:
+            return {
+                "documentos_referenciados": self.referenciados,
+                "blobs_nuevos": self.nuevos,
+                "blobs_reusados": self.referenciados - self.nuevos,
+                "bytes_referenciados": self.bytes_referenciados,
+                "bytes_subidos": self.bytes_subidos,
+                "dedup_ratio": (self.referenciados / self.nuevos) if self.nuevos else None,
+            }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,87 @@
+"""
+Dataset procesado en formato columnar (Parquet)
+Tesis LexGO - Lectura/escritura de train/test para el clasificador
+
+preparar_datos.py escribe data/processed/dataset.parquet con las columnas
+filename, texto, etapa y split ("train"/"test"), comprimido con zstd. Los
+lectores cargan solo las columnas y el split que necesitan, opcionalmente con
+memory-map. Las columnas derivadas (longitud_texto, num_palabras) no se
+guardan: se recalculan al vuelo.
+
+pyarrow es opcional: sin él (o sin el .parquet) se leen los CSV de siempre,
+que preparar_datos.py sigue escribiendo.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = pq = None
+
+PROCESSED_DIR = Path("data/processed")
+DATASET_PARQUET = PROCESSED_DIR / "dataset.parquet"
+COMPRESION = "zstd"
+COLUMNAS = ["filename", "texto", "etapa", "split"]
+
+
+def parquet_disponible():
+    return pq is not None
+
+
+def guardar_dataset(df_train, df_test, path=DATASET_PARQUET):
+    """
+    Escribe train y test (con columnas filename, texto, etapa) en un solo
+    Parquet con columna `split`. Respeta el orden de cada split, así leer un
+    split devuelve las mismas filas que el CSV correspondiente.
+    Devuelve la ruta, o None si pyarrow no está instalado. En ese caso se borra
+    el Parquet de una corrida anterior: si no, un entorno con pyarrow leería
+    un split viejo en lugar de los CSV recién escritos.
+    """
+    if pq is None:
+        Path(path).unlink(missing_ok=True)
+        return None
+    partes = []
+    for split, df in (("train", df_train), ("test", df_test)):
+        parte = df[["filename", "texto", "etapa"]].copy()
+        parte["split"] = split
+        partes.append(parte)
+    df = pd.concat(partes, ignore_index=True)
+    tabla = pa.Table.from_pandas(df[COLUMNAS], preserve_index=False)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    # etapa y split se guardan como diccionario (pocas categorías repetidas)
+    pq.write_table(tabla, tmp, compression=COMPRESION, use_dictionary=["etapa", "split"])
+    tmp.replace(path)
+    return path
+
+
+def cargar_split(split, columnas=("texto", "etapa"), path=DATASET_PARQUET, memory_map=True):
+    """
+    DataFrame con las `columnas` pedidas del split "train", "test" o None (todo).
+    Lee el Parquet si hay pyarrow y el archivo existe; si no, el CSV del split
+    (train.csv / test.csv / dataset_completo.csv).
+    """
+    columnas = list(columnas)
+    path = Path(path)
+    if pq is not None and path.exists():
+        filtros = [("split", "==", split)] if split else None
+        tabla = pq.read_table(path, columns=columnas, filters=filtros, memory_map=memory_map)
+        # Liberar los buffers de Arrow a medida que se convierten: si no, la
+        # memoria pico es ~Arrow + pandas y el pool la retiene después
+        df = tabla.to_pandas(self_destruct=True, split_blocks=True)
+        del tabla
+        pa.default_memory_pool().release_unused()
+        return df
+    csv = PROCESSED_DIR / (f"{split}.csv" if split else "dataset_completo.csv")
+    return pd.read_csv(csv, usecols=lambda c: c in columnas)[columnas]
+
+
+def existe_dataset(split, path=DATASET_PARQUET):
+    if pq is not None and Path(path).exists():
+        return True
+    return (PROCESSED_DIR / (f"{split}.csv" if split else "dataset_completo.csv")).exists()
@@ -0,0 +1,169 @@
+"""
+Descarga concurrente de documentos
+Sesión HTTP compartida (keep-alive + pool de conexiones), token bucket por host,
+reintentos con backoff en 429/5xx y métricas de docs/s y bytes/s.
+Con stream=True el cuerpo se baja por bloques a un archivo temporal (memoria constante).
+"""
+
+import hashlib
+import random
+import threading
+import time
+import urllib.parse
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from s3_storage import CHUNK_SIZE, spool_stream
+
+REQUESTS_TIMEOUT = (10, 25)  # (connect, read)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Resultado de fetch(): status 304 => no modificado; data y file None => falló.
+# Con stream=True el cuerpo queda en `file` (archivo temporal) en lugar de `data`.
+Descarga = namedtuple("Descarga", "status data file sha256 size content_type etag last_modified")
+NO_DESCARGADO = Descarga(None, None, None, None, 0, None, None, None)
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` pedidos/seg con ráfagas de hasta `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.rate
+            time.sleep(espera)
+
+
+class Downloader:
+    """
+    Descargador compartido. fetch() es thread-safe: los consumidores de
+    run() lo llaman desde `concurrency` hilos con una sola sesión.
+    """
+
+    def __init__(self, concurrency=8, rate_per_host=4.0, burst=4, max_retries=4,
+                 backoff_seg=0.5, timeout=REQUESTS_TIMEOUT, headers=None):
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_seg = backoff_seg
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.docs = 0
+        self.bytes = 0
+        self.errores = 0
+        self.no_modificados = 0
+        self.t0 = time.perf_counter()
+
+    def _bucket(self, url):
+        host = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            return self._buckets[host]
+
+    def _espera_reintento(self, intento, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_seg * (2 ** intento) * (1 + random.random() * 0.25)
+
+    def fetch(self, url, etag=None, last_modified=None, stream=False):
+        """
+        Descarga url con GET condicional si se pasan validadores.
+        Devuelve Descarga; status 304 indica que el documento no cambió.
+        stream: baja el cuerpo por bloques a un archivo temporal (Descarga.file),
+        que el llamador debe cerrar.
+        """
+        bucket = self._bucket(url)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        for intento in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                r = self.session.get(url, timeout=self.timeout, allow_redirects=True,
+                                     headers=headers, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento < self.max_retries:
+                    time.sleep(self._espera_reintento(intento))
+                    continue
+                break
+            except requests.RequestException:
+                break
+
+            with r:
+                if r.status_code in RETRY_STATUS and intento < self.max_retries:
+                    time.sleep(self._espera_reintento(intento, r))
+                    continue
+                if r.status_code == 304:
+                    with self._lock:
+                        self.no_modificados += 1
+                    return Descarga(304, None, None, None, 0, None, etag, last_modified)
+                try:
+                    r.raise_for_status()
+                    if stream:
+                        data = None
+                        fh, sha, size = spool_stream(r.iter_content(CHUNK_SIZE))
+                    else:
+                        data, fh = r.content, None
+                        sha, size = hashlib.sha256(data).hexdigest(), len(data)
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError):
+                    if intento < self.max_retries:
+                        time.sleep(self._espera_reintento(intento))
+                        continue
+                    break
+                except requests.RequestException:
+                    break
+
+            with self._lock:
+                self.docs += 1
+                self.bytes += size
+            return Descarga(r.status_code, data, fh, sha, size, r.headers.get("Content-Type", ""),
+                            r.headers.get("ETag"), r.headers.get("Last-Modified"))
+
+        with self._lock:
+            self.errores += 1
+        return NO_DESCARGADO
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.t0, 1e-9)
+        return {
+            "docs": self.docs,
+            "bytes": self.bytes,
+            "errores": self.errores,
+            "no_modificados": self.no_modificados,
+            "segundos": elapsed,
+            "docs_por_seg": self.docs / elapsed,
+            "bytes_por_seg": self.bytes / elapsed,
+        }
+
+    def close(self):
+        self.session.close()
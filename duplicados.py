@@ -0,0 +1,279 @@
+"""
+Detección de casi-duplicados con MinHash + LSH
+Cada documento se reduce a una firma MinHash de NUM_PERM valores sobre sus
+shingles de SHINGLE palabras (normalizadas como en bm25_index: minúsculas y sin
+acentos). La firma se parte en BANDAS; dos documentos son candidatos si
+coinciden en alguna banda, y se confirman si su Jaccard estimado supera el
+umbral. Así no se comparan todos contra todos.
+
+La firma usa "one permutation hashing": un solo hash por shingle repartido en
+NUM_PERM cubetas (mínimo por cubeta), en vez de NUM_PERM hashes por shingle.
+En documentos (PDF/HTML) la firma usa solo las primeras PAGINAS_FIRMA páginas /
+CHARS_FIRMA caracteres, para que el gate del crawl tenga costo acotado.
+
+- `reporte`: clusters de casi-duplicados en rag_fulltexts.jsonl y/o carpetas de documentos.
+- NearDupIndex: índice persistente (SQLite) que usa 1_build_library.py como gate
+  para no guardar documentos casi idénticos a uno ya subido.
+
+Uso:
+    python duplicados.py reporte [rag_fulltexts.jsonl] [--dir data/raw] [--umbral 0.8]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bm25_index import tokenize
+from pdf_texto import iter_pages
+
+NUM_PERM = 128
+BANDAS = 16                 # 16 bandas × 8 filas: candidatos desde Jaccard ~0.7
+SHINGLE = 5
+UMBRAL = 0.8
+# Presupuesto de texto por documento (la firma sale del principio del documento)
+PAGINAS_FIRMA = 20
+CHARS_FIRMA = 100_000
+_BITS_CUBETA = 7            # 2**7 = NUM_PERM cubetas
+_MASK = (1 << (64 - _BITS_CUBETA)) - 1
+_VACIO = 1 << 64
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def firma(texto):
+    """Firma MinHash (lista de NUM_PERM enteros) o None si el texto no tiene palabras."""
+    tokens = tokenize(texto or "")
+    if not tokens:
+        return None
+    n = max(1, len(tokens) - SHINGLE + 1)
+    shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(n)}
+    mins = [_VACIO] * NUM_PERM
+    for shingle in shingles:
+        h = _hash64(shingle.encode("utf-8"))
+        cubeta = h >> (64 - _BITS_CUBETA)
+        valor = h & _MASK
+        if valor < mins[cubeta]:
+            mins[cubeta] = valor
+    # Densificación: una cubeta vacía toma el valor de la siguiente no vacía
+    if _VACIO in mins:
+        for i in range(NUM_PERM):
+            j = i
+            while mins[j % NUM_PERM] == _VACIO:
+                j += 1
+            if j != i:
+                mins[i] = mins[j % NUM_PERM] + (j - i)
+    return mins
+
+
+def similitud(a, b):
+    """Jaccard estimado entre dos firmas."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def bandas(sig):
+    """Claves LSH (una por banda)."""
+    filas = NUM_PERM // BANDAS
+    return [_hash64(array("Q", sig[i * filas:(i + 1) * filas]).tobytes()) >> 1 for i in range(BANDAS)]
+
+
+def texto_documento(fh, content_type=None, nombre="", usar_cache=False):
+    """
+    Texto de un documento (PDF o HTML/texto, file object binario con seek) para
+    calcular su firma, hasta PAGINAS_FIRMA páginas / CHARS_FIRMA caracteres.
+    No carga el archivo entero ni parsea el PDF completo. La caché de pdf_texto
+    queda apagada por defecto: las descargas del crawl no van a data/cache/pdf_texto.
+    """
+    es_pdf = "pdf" in (content_type or "").lower() or nombre.lower().endswith(".pdf") or fh.read(5) == b"%PDF-"
+    fh.seek(0)
+    if es_pdf:
+        texto = "\n".join(iter_pages(fh, PAGINAS_FIRMA, CHARS_FIRMA, usar_cache=usar_cache))
+    else:
+        texto = re.sub(r"<[^>]+>", " ", fh.read(4 * CHARS_FIRMA).decode("utf-8", errors="ignore"))
+    return texto[:CHARS_FIRMA]
+
+
+def clusters(firmas, umbral=UMBRAL):
+    """
+    firmas: dict id → firma. Devuelve lista de clusters [{ids, similitud_min}]
+    con 2 o más documentos, usando LSH para generar candidatos.
+    """
+    padre = {doc_id: doc_id for doc_id in firmas}
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    cubetas = {}
+    for doc_id, sig in firmas.items():
+        for banda, clave in enumerate(bandas(sig)):
+            cubetas.setdefault((banda, clave), []).append(doc_id)
+
+    pares = {}
+    for ids in cubetas.values():
+        for i in range(1, len(ids)):
+            for j in range(i):
+                par = (ids[j], ids[i])
+                if par in pares:
+                    continue
+                pares[par] = s = similitud(firmas[par[0]], firmas[par[1]])
+                if s >= umbral:
+                    padre[raiz(par[0])] = raiz(par[1])
+
+    grupos = {}
+    for doc_id in firmas:
+        grupos.setdefault(raiz(doc_id), []).append(doc_id)
+    resultado = []
+    for ids in grupos.values():
+        if len(ids) < 2:
+            continue
+        sims = [pares.get((a, b), pares.get((b, a))) for i, a in enumerate(ids) for b in ids[i + 1:]]
+        sims = [s for s in sims if s is not None]
+        resultado.append({"ids": ids, "similitud_min": min(sims) if sims else None,
+                          "pares_comparados": len(sims)})
+    resultado.sort(key=lambda c: -len(c["ids"]))
+    return resultado
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS firmas (
+    doc_id     TEXT PRIMARY KEY,
+    firma      BLOB NOT NULL,
+    ref        TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bandas (
+    banda  INTEGER NOT NULL,
+    clave  INTEGER NOT NULL,
+    doc_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bandas_clave ON bandas (banda, clave);
+"""
+
+
+class NearDupIndex:
+    """
+    Índice persistente de firmas para usar como gate antes de guardar un documento.
+    Thread-safe (una conexión compartida con lock), igual que CrawlState.
+    """
+
+    def __init__(self, path, umbral=UMBRAL):
+        self.path = str(path)
+        self.umbral = umbral
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+        self.descartados = 0
+
+    def registrar(self, doc_id, sig, ref=None):
+        """
+        Busca un casi-duplicado de `sig`; si no hay, registra el documento.
+        Devuelve None (documento nuevo) o {doc_id, similitud, ref} del ya existente.
+        """
+        claves = bandas(sig)
+        with self.lock, self.conn:
+            candidatos = set()
+            for banda, clave in enumerate(claves):
+                candidatos.update(r[0] for r in self.conn.execute(
+                    "SELECT doc_id FROM bandas WHERE banda = ? AND clave = ?", (banda, clave)))
+            candidatos.discard(doc_id)
+            mejor = None
+            for cand in candidatos:
+                fila = self.conn.execute("SELECT firma, ref FROM firmas WHERE doc_id = ?", (cand,)).fetchone()
+                s = similitud(sig, array("Q", fila[0]))
+                if s >= self.umbral and (mejor is None or s > mejor["similitud"]):
+                    mejor = {"doc_id": cand, "similitud": s, "ref": json.loads(fila[1]) if fila[1] else None}
+            if mejor:
+                self.descartados += 1
+                return mejor
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO firmas (doc_id, firma, ref, created_at) VALUES (?, ?, ?, ?)",
+                (doc_id, array("Q", sig).tobytes(), json.dumps(ref) if ref else None,
+                 datetime.now(timezone.utc).isoformat()))
+            if cur.rowcount == 1:
+                self.conn.executemany("INSERT INTO bandas (banda, clave, doc_id) VALUES (?, ?, ?)",
+                                      [(b, c, doc_id) for b, c in enumerate(claves)])
+        return None
+
+    def actualizar_ref(self, doc_id, ref):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE firmas SET ref = ? WHERE doc_id = ?", (json.dumps(ref), doc_id))
+
+    def olvidar(self, doc_id):
+        """Deshace un registrar() cuya subida falló."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM firmas WHERE doc_id = ?", (doc_id,))
+            self.conn.execute("DELETE FROM bandas WHERE doc_id = ?", (doc_id,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _firmas_corpus(src):
+    firmas = {}
+    with open(src, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            sig = firma(rec.get("text"))
+            if sig:
+                firmas[rec["id"]] = sig
+    return firmas
+
+
+def _firmas_dir(base):
+    firmas = {}
+    for path in sorted(Path(base).rglob("*")):
+        if path.suffix.lower() not in (".pdf", ".html", ".htm", ".txt") or not path.is_file():
+            continue
+        try:
+            with open(path, "rb") as fh:
+                sig = firma(texto_documento(fh, nombre=path.name, usar_cache=True))
+        except Exception as e:
+            print(f"⚠️  {path}: {e}")
+            continue
+        if sig:
+            firmas[path.as_posix()] = sig
+    return firmas
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("reporte", help="Clusters de casi-duplicados")
+    r.add_argument("src", nargs="?", default="rag_fulltexts.jsonl")
+    r.add_argument("--dir", action="append", default=[], help="Carpeta de documentos (repetible)")
+    r.add_argument("--umbral", type=float, default=UMBRAL)
+    r.add_argument("--out", default="data/duplicados_reporte.json")
+    args = ap.parse_args()
+
+    firmas = _firmas_corpus(args.src) if args.src else {}
+    for base in args.dir:
+        firmas.update(_firmas_dir(base))
+    grupos = clusters(firmas, args.umbral)
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump({"umbral": args.umbral, "documentos": len(firmas), "clusters": grupos},
+                  fh, ensure_ascii=False, indent=1)
+    print(f"🔍 {len(firmas)} documentos, {len(grupos)} clusters de casi-duplicados (umbral {args.umbral})")
+    for c in grupos:
+        print(f"   [{c['similitud_min']:.2f}] {', '.join(c['ids'])}")
+    print(f"💾 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Tesis LexGO - Modelo ML con TF-IDF + Random Forest
 import pandas as pd
 import pickle
 from pathlib import Path
+from dataset_procesado import cargar_split, existe_dataset
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (
@@ -23,17 +24,14 @@ def entrenar_modelo():
     print("🤖 ENTRENAMIENTO DEL CLASIFICADOR ML")
     print("=" * 60)
     
-    # Cargar datos
-    train_path = "data/processed/train.csv"
-    test_path = "data/processed/test.csv"
-    
-    if not Path(train_path).exists():
-        print("❌ No se encontró train.csv")
+    # Cargar datos (Parquet si está disponible, si no los CSV)
+    if not existe_dataset("train"):
+        print("❌ No se encontró el dataset de train")
         print("   Primero ejecuta: python preparar_datos.py")
         return
     
-    train_df = pd.read_csv(train_path)
-    test_df = pd.read_csv(test_path)
+    train_df = cargar_split("train")
+    test_df = cargar_split("test")
     
     print(f"\n✓ Train: {len(train_df)} documentos")
     print(f"✓ Test: {len(test_df)} documentos")
@@ -50,8 +48,8 @@ def entrenar_modelo():
         ngram_range=(1, 2),     # Unigramas y bigramas
         min_df=2,               # Palabra debe aparecer en al menos 2 docs
         max_df=0.8,             # Ignorar palabras muy frecuentes
-        strip_accents='unicode',
-        lowercase=True
+        strip_accents='unicode',  # limpiar() conserva los acentos (salida igual a clean_text)
+        lowercase=False         # El dataset ya viene en minúsculas (normalizacion.limpiar)
     )
     
     X_train_tfidf = vectorizer.fit_transform(X_train)
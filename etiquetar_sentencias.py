@@ -5,21 +5,12 @@ Tesis LexGO - Clasificador de Etapas Procesales
 
 import pandas as pd
 from pathlib import Path
-import PyPDF2
+from pdf_texto import extract_text_from_pdf
 import csv
 
-def extract_text_from_pdf(pdf_path):
-    """Extrae texto de un PDF"""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
-    except Exception as e:
-        print(f"❌ Error en {pdf_path}: {e}")
-        return None
+# Solo se muestran/guardan los primeros caracteres: no hace falta extraer todo el PDF
+PAGINAS_PREVIEW = 3
+CHARS_PREVIEW = 1000
 
 def main():
     """Proceso de etiquetado interactivo"""
@@ -70,7 +61,7 @@ def main():
         print("-" * 60)
         
         # Extraer y mostrar preview del texto
-        text = extract_text_from_pdf(pdf_path)
+        text = extract_text_from_pdf(pdf_path, PAGINAS_PREVIEW, CHARS_PREVIEW)
         
         if text is None:
             print("⚠️  No se pudo extraer texto, saltando...")
@@ -0,0 +1,146 @@
+"""
+Compresión paralela de JSONL
+Parte el archivo en bloques que respetan los límites de registro, comprime cada
+bloque en un proceso aparte y los concatena como gzip multi-miembro (o frames
+zstd). Junto al comprimido se escribe un índice de bloques para poder
+descomprimir uno solo sin leer el resto.
+
+Uso:
+    python jsonl_compress.py rag_fulltexts.jsonl [--zstd] [--workers 4]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # zstd es opcional
+    zstandard = None
+
+BLOCK_SIZE = 4 * 1024 * 1024   # bytes sin comprimir por bloque (aprox.)
+FORMATOS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def iter_jsonl_blocks(path, block_size=BLOCK_SIZE):
+    """Rinde (offset, bytes, n_registros) cortando siempre en fin de línea."""
+    offset = 0
+    buf = []
+    size = 0
+    with open(path, "rb") as fh:
+        for line in fh:
+            buf.append(line)
+            size += len(line)
+            if size >= block_size:
+                yield offset, b"".join(buf), len(buf)
+                offset += size
+                buf, size = [], 0
+    if buf:
+        yield offset, b"".join(buf), len(buf)
+
+
+def _compress_block(data, fmt, level):
+    if fmt == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    # mtime=0 para que la salida sea reproducible
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_job(job):
+    offset, data, n, fmt, level = job
+    return offset, len(data), n, _compress_block(data, fmt, level)
+
+
+def compress_jsonl(path, out_path=None, fmt="gzip", level=None, workers=None,
+                   block_size=BLOCK_SIZE):
+    """
+    Comprime `path` en paralelo. Devuelve (out_path, index_path).
+    El índice lista por bloque: registros, offset/largo sin comprimir y comprimido.
+    """
+    if fmt not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    if fmt == "zstd" and zstandard is None:
+        raise RuntimeError("Para --zstd instalá el paquete 'zstandard'")
+    level = level if level is not None else (6 if fmt == "gzip" else 10)
+    workers = workers or os.cpu_count() or 1
+    out_path = out_path or f"{path}{FORMATOS[fmt]}"
+    index_path = f"{out_path}.idx.json"
+
+    blocks = []
+    comp_offset = 0
+    primer_registro = 0
+    h = hashlib.sha256()
+    jobs = ((off, data, n, fmt, level) for off, data, n in iter_jsonl_blocks(path, block_size))
+    with open(out_path, "wb") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        # Ventana acotada de bloques en vuelo; se escriben en orden
+        ventana = deque()
+        for job in jobs:
+            ventana.append(pool.submit(_compress_job, job))
+            if len(ventana) >= workers * 2:
+                comp_offset, primer_registro = _escribir(ventana.popleft().result(), out, h,
+                                                         blocks, comp_offset, primer_registro)
+        while ventana:
+            comp_offset, primer_registro = _escribir(ventana.popleft().result(), out, h,
+                                                     blocks, comp_offset, primer_registro)
+
+    index = {
+        "source": os.path.basename(path),
+        "format": fmt,
+        "level": level,
+        "records": primer_registro,
+        "sha256": h.hexdigest(),
+        "blocks": blocks,
+    }
+    with open(index_path, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    return out_path, index_path
+
+
+def _escribir(result, out, h, blocks, comp_offset, primer_registro):
+    raw_offset, raw_length, n, comp = result
+    out.write(comp)
+    h.update(comp)
+    blocks.append({
+        "first_record": primer_registro,
+        "records": n,
+        "raw_offset": raw_offset,
+        "raw_length": raw_length,
+        "offset": comp_offset,
+        "length": len(comp),
+    })
+    return comp_offset + len(comp), primer_registro + n
+
+
+def read_block(path, block, fmt="gzip"):
+    """Descomprime un único bloque del archivo usando su entrada del índice."""
+    with open(path, "rb") as fh:
+        fh.seek(block["offset"])
+        comp = fh.read(block["length"])
+    if fmt == "zstd":
+        return zstandard.ZstdDecompressor().decompress(comp, max_output_size=block["raw_length"])
+    return gzip.decompress(comp)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path", help="Archivo JSONL a comprimir")
+    ap.add_argument("--out", default=None, help="Ruta de salida (default: <path>.gz / .zst)")
+    ap.add_argument("--zstd", action="store_true", help="Usar zstd en lugar de gzip")
+    ap.add_argument("--level", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--block-mb", type=float, default=BLOCK_SIZE / (1024 * 1024))
+    args = ap.parse_args()
+
+    out, idx = compress_jsonl(args.path, args.out, fmt="zstd" if args.zstd else "gzip",
+                              level=args.level, workers=args.workers,
+                              block_size=int(args.block_mb * 1024 * 1024))
+    print(f"[OK] {out}")
+    print(f"[INDEX] {idx}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Índice denso (LSA) sobre el corpus RAG
+TF-IDF + TruncatedSVD ajustados sobre los chunks del corpus; los embeddings
+(float32, normalizados L2) se guardan en una matriz en disco que se abre con
+np.memmap. La búsqueda es exacta: producto matricial por bloques + argpartition.
+
+El texto se normaliza con normalizacion.limpiar, igual que el dataset del
+clasificador.
+
+Incremental: `update` agrega los chunks de registros nuevos o cambiados
+proyectándolos con el modelo ya ajustado (sin re-ajustar). Las filas de un
+registro que cambió quedan marcadas como borradas.
+
+Uso:
+    python lsa_index.py fit [--chunks data/chunks] [--out data/lsa] [--dim 256]
+    python lsa_index.py update [--chunks data/chunks] [--out data/lsa]
+    python lsa_index.py search "despido por incapacidad" [-k 10]
+"""
+
+import argparse
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from normalizacion import limpiar_lote
+
+DIM = 256
+BLOCK_ROWS = 65536          # filas por bloque en la búsqueda
+MODEL_NAME = "lsa_model.pkl"
+EMB_NAME = "lsa_embeddings.f32"
+DOCS_NAME = "lsa_docs.json"
+CAMPOS_DOC = ("id", "parent_id", "article", "title", "type")
+
+
+def _iter_chunks_por_registro(chunks_dir):
+    """Rinde (parent_id, sha256 del registro, chunks) desde el store de corpus_chunks."""
+    chunks_dir = Path(chunks_dir)
+    with open(chunks_dir / "manifest.json", "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    for parent_id, entrada in manifest["records"].items():
+        with open(chunks_dir / "records" / entrada["file"], "r", encoding="utf-8") as fh:
+            chunks = [json.loads(line) for line in fh]
+        yield parent_id, entrada["sha256"], chunks
+
+
+def _doc_meta(chunk):
+    return {campo: chunk.get("chunk_id" if campo == "id" else campo) for campo in CAMPOS_DOC}
+
+
+def _embed(model, textos):
+    vectorizer, svd = model
+    emb = svd.transform(vectorizer.transform(list(limpiar_lote(textos)))).astype(np.float32)
+    normas = np.linalg.norm(emb, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return emb / normas
+
+
+def fit_index(chunks_dir, out_dir, dim=DIM):
+    """Ajusta TF-IDF + SVD sobre todos los chunks y escribe el índice completo."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    textos, docs, registros = [], [], {}
+    for parent_id, sha, chunks in _iter_chunks_por_registro(chunks_dir):
+        registros[parent_id] = sha
+        for chunk in chunks:
+            textos.append(chunk["text"])
+            docs.append(_doc_meta(chunk))
+
+    vectorizer = TfidfVectorizer(
+        min_df=2,
+        max_df=0.8,
+        sublinear_tf=True,
+        strip_accents='unicode',
+        lowercase=False,        # limpiar() ya pasa a minúsculas
+    )
+    tfidf = vectorizer.fit_transform(list(limpiar_lote(textos)))
+    svd = TruncatedSVD(n_components=min(dim, tfidf.shape[1] - 1), random_state=42)
+    svd.fit(tfidf)
+    model = (vectorizer, svd)
+    with open(out_dir / MODEL_NAME, "wb") as fh:
+        pickle.dump(model, fh)
+
+    emb = _embed(model, textos)
+    emb.tofile(out_dir / EMB_NAME)
+    _guardar_docs(out_dir, {"dim": emb.shape[1], "docs": docs, "deleted": [], "records": registros})
+    return {"docs": len(docs), "dim": emb.shape[1], "vocab": len(vectorizer.vocabulary_)}
+
+
+def update_index(chunks_dir, out_dir):
+    """Agrega los chunks de registros nuevos o cambiados sin re-ajustar el modelo."""
+    out_dir = Path(out_dir)
+    with open(out_dir / MODEL_NAME, "rb") as fh:
+        model = pickle.load(fh)
+    info = _cargar_docs(out_dir)
+    borrados = set(info["deleted"])
+    textos, nuevos = [], []
+    vigentes, cambiados = set(), set()
+    for parent_id, sha, chunks in _iter_chunks_por_registro(chunks_dir):
+        vigentes.add(parent_id)
+        if info["records"].get(parent_id) == sha:
+            continue
+        if parent_id in info["records"]:
+            cambiados.add(parent_id)
+        info["records"][parent_id] = sha
+        for chunk in chunks:
+            textos.append(chunk["text"])
+            nuevos.append(_doc_meta(chunk))
+    # Filas viejas de registros cambiados o quitados del corpus
+    for fila, doc in enumerate(info["docs"]):
+        if doc["parent_id"] in cambiados or doc["parent_id"] not in vigentes:
+            borrados.add(fila)
+    for parent_id in set(info["records"]) - vigentes:
+        del info["records"][parent_id]
+
+    if textos:
+        emb = _embed(model, textos)
+        with open(out_dir / EMB_NAME, "ab") as fh:
+            emb.tofile(fh)
+        info["docs"].extend(nuevos)
+    info["deleted"] = sorted(borrados)
+    _guardar_docs(out_dir, info)
+    return {"added": len(nuevos), "changed_records": len(cambiados), "deleted_rows": len(borrados)}
+
+
+def _cargar_docs(out_dir):
+    with open(Path(out_dir) / DOCS_NAME, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _guardar_docs(out_dir, info):
+    tmp = Path(out_dir) / (DOCS_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(info, fh, ensure_ascii=False)
+    tmp.replace(Path(out_dir) / DOCS_NAME)
+
+
+def top_k(emb, q, k, block_rows=BLOCK_ROWS, excluir=None):
+    """
+    Top-k exacto por producto interno, recorriendo `emb` (puede ser un memmap)
+    de a bloques. Devuelve (filas, scores) ordenados de mayor a menor.
+    """
+    mejores_filas = np.empty(0, dtype=np.int64)
+    mejores_scores = np.empty(0, dtype=np.float32)
+    for inicio in range(0, emb.shape[0], block_rows):
+        scores = np.asarray(emb[inicio:inicio + block_rows]) @ q
+        if excluir is not None:
+            scores[excluir[inicio:inicio + block_rows]] = -np.inf
+        if scores.shape[0] > k:
+            idx = np.argpartition(scores, -k)[-k:]
+        else:
+            idx = np.arange(scores.shape[0])
+        mejores_filas = np.concatenate([mejores_filas, idx + inicio])
+        mejores_scores = np.concatenate([mejores_scores, scores[idx]])
+        if mejores_scores.shape[0] > k:
+            keep = np.argpartition(mejores_scores, -k)[-k:]
+            mejores_filas, mejores_scores = mejores_filas[keep], mejores_scores[keep]
+    orden = np.argsort(-mejores_scores)
+    return mejores_filas[orden], mejores_scores[orden]
+
+
+class LSAIndex:
+    """Índice cargado para consultas. Abrirlo una vez y reutilizarlo."""
+
+    def __init__(self, index_dir, block_rows=BLOCK_ROWS):
+        index_dir = Path(index_dir)
+        with open(index_dir / MODEL_NAME, "rb") as fh:
+            self.model = pickle.load(fh)
+        info = _cargar_docs(index_dir)
+        self.docs = info["docs"]
+        self.dim = info["dim"]
+        self.block_rows = block_rows
+        self.emb = np.memmap(index_dir / EMB_NAME, dtype=np.float32, mode="r",
+                             shape=(len(self.docs), self.dim))
+        self.borrados = None
+        if info["deleted"]:
+            self.borrados = np.zeros(len(self.docs), dtype=bool)
+            self.borrados[info["deleted"]] = True
+
+    def __len__(self):
+        return len(self.docs) - (int(self.borrados.sum()) if self.borrados is not None else 0)
+
+    def embed(self, texto):
+        return _embed(self.model, [texto])[0]
+
+    def search(self, query, k=10):
+        """Top-k como lista de (score, doc) ordenada de mayor a menor."""
+        filas, scores = top_k(self.emb, self.embed(query), k, self.block_rows, self.borrados)
+        return [(float(s), self.docs[f]) for f, s in zip(filas, scores) if np.isfinite(s)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fit", help="Ajustar el modelo y construir el índice")
+    f.add_argument("--chunks", default="data/chunks")
+    f.add_argument("--out", default="data/lsa")
+    f.add_argument("--dim", type=int, default=DIM)
+    u = sub.add_parser("update", help="Agregar registros nuevos o cambiados sin re-ajustar")
+    u.add_argument("--chunks", default="data/chunks")
+    u.add_argument("--out", default="data/lsa")
+    s = sub.add_parser("search", help="Consultar el índice")
+    s.add_argument("query")
+    s.add_argument("-k", type=int, default=10)
+    s.add_argument("--index", default="data/lsa")
+    args = ap.parse_args()
+
+    if args.cmd == "fit":
+        r = fit_index(args.chunks, args.out, args.dim)
+        print(f"✓ {r['docs']} chunks, vocabulario {r['vocab']}, dim {r['dim']} → {args.out}")
+    elif args.cmd == "update":
+        r = update_index(args.chunks, args.out)
+        print(f"✓ {r['added']} chunks agregados ({r['changed_records']} registros cambiados), "
+              f"{r['deleted_rows']} filas borradas")
+    else:
+        index = LSAIndex(args.index)
+        for score, doc in index.search(args.query, args.k):
+            art = f" art. {doc['article']}" if doc.get("article") else ""
+            print(f"{score:6.3f}  {doc['id']}{art} — {doc.get('title') or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Normalización de texto compartida por preparación, entrenamiento e inferencia
+Tesis LexGO - Una sola implementación de clean_text
+
+limpiar() devuelve exactamente lo mismo que la versión original con cuatro
+re.sub por documento:
+
+    minúsculas → colapsar espacios en blanco → borrar caracteres fuera de
+    [\\w\\s.,;:()-] → strip
+
+pero sin pasar el texto por el motor de regex:
+
+- Camino rápido: el texto se codifica a Latin-1 y se trabaja sobre bytes con
+  dos tablas de traducción precalculadas. Una pasa a minúsculas y lleva todo
+  espacio en blanco a ' ', la otra borra lo no permitido; los espacios
+  repetidos se colapsan con replace. Los caracteres fuera de Latin-1 que solo
+  se borran o son espacios (comillas tipográficas, guiones largos, viñetas)
+  se traducen al codificar, con un error handler que cachea por carácter.
+- Si aparece una letra fuera de Latin-1 (griego, ŀ, ...): lower + split/join
+  y se borran solo los caracteres distintos que aparecen en el texto.
+
+El texto ya normalizado está en minúsculas: el TfidfVectorizer del
+clasificador no vuelve a pasarlo a minúsculas (lowercase=False).
+
+Uso (benchmark contra la versión con re.sub):
+    python normalizacion.py [rag_fulltexts.jsonl]
+"""
+
+import codecs
+import re
+import sys
+import time
+
+# Caracteres que sobreviven a la limpieza (además de los espacios)
+PERMITIDO_RE = re.compile(r"[\w\s\.,;:()\-]")
+
+# Tablas para el camino Latin-1: minúsculas + espacios → ' ', y bytes a borrar
+_LATIN1 = [chr(i) for i in range(256)]
+_TABLA_MINUSCULAS = bytes(32 if c.isspace() else ord(c.lower()) for c in _LATIN1)
+_BORRAR_LATIN1 = bytes(i for i, c in enumerate(_LATIN1) if not PERMITIDO_RE.match(c))
+
+_se_borra = {}
+
+
+def _borrar(c):
+    """True si `c` no está permitido (cacheado por carácter)."""
+    r = _se_borra.get(c)
+    if r is None:
+        r = _se_borra[c] = PERMITIDO_RE.match(c) is None
+    return r
+
+
+class _FueraDeLatin1(Exception):
+    pass
+
+
+_reemplazos = {}
+
+
+def _reemplazo(c):
+    """
+    Bytes Latin-1 equivalentes a `c` en minúsculas: ' ' si es espacio, \\x00
+    (que se borra después, como `c`) si no está permitido. None si hay que
+    conservar un carácter que no entra en Latin-1.
+    """
+    if c in _reemplazos:
+        return _reemplazos[c]
+    partes = bytearray()
+    for d in c.lower():
+        if ord(d) < 256:
+            partes.append(ord(d))
+        elif d.isspace():
+            partes.append(32)
+        elif _borrar(d):
+            partes.append(0)
+        else:
+            partes = None
+            break
+    r = _reemplazos[c] = bytes(partes) if partes is not None else None
+    return r
+
+
+def _a_latin1(err):
+    salida = bytearray()
+    for c in err.object[err.start:err.end]:
+        r = _reemplazo(c)
+        if r is None:
+            raise _FueraDeLatin1
+        salida += r
+    return bytes(salida), err.end
+
+
+codecs.register_error("normalizacion_latin1", _a_latin1)
+
+
+def _limpiar_latin1(data):
+    data = data.translate(_TABLA_MINUSCULAS)
+    while b"  " in data:
+        data = data.replace(b"  ", b" ")
+    return data.translate(None, _BORRAR_LATIN1).strip(b" ").decode("latin-1")
+
+
+def limpiar(texto):
+    """Limpia y normaliza un texto (mismo resultado que el clean_text original)."""
+    if not texto:
+        return ""
+    try:
+        data = texto.encode("latin-1", "normalizacion_latin1")
+    except _FueraDeLatin1:
+        pass
+    else:
+        return _limpiar_latin1(data)
+    texto = " ".join(texto.lower().split())
+    for c in set(texto):
+        if _borrar(c):
+            texto = texto.replace(c, "")
+    return texto.strip()
+
+
+def limpiar_lote(textos):
+    """Rinde cada texto de un iterable (lista, Series, generador) ya limpio."""
+    for texto in textos:
+        yield limpiar(texto) if isinstance(texto, str) else ""
+
+
+def limpiar_serie(serie):
+    """Series de pandas con cada texto limpio (mismo índice; NaN → "")."""
+    return serie.map(lambda t: limpiar(t) if isinstance(t, str) else "")
+
+
+def _limpiar_regex(text):
+    """Versión original (cuatro pasadas por documento), solo para comparar."""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'\n+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.,;:()\-]', '', text)
+    return text.strip()
+
+
+def main():
+    import json
+    src = sys.argv[1] if len(sys.argv) > 1 else "rag_fulltexts.jsonl"
+    with open(src, "r", encoding="utf-8") as fh:
+        textos = [json.loads(line).get("text") or "" for line in fh if line.strip()]
+    mb = sum(len(t.encode("utf-8")) for t in textos) / 1e6
+    print(f"📊 {len(textos)} textos, {mb:.1f} MB")
+
+    resultados = {}
+    for nombre, fn in (("re.sub", lambda ts: [_limpiar_regex(t) for t in ts]),
+                       ("normalizacion", lambda ts: list(limpiar_lote(ts)))):
+        tiempos = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            resultados[nombre] = fn(textos)
+            tiempos.append(time.perf_counter() - t0)
+        print(f"   {nombre:14s}: {mb / min(tiempos):6.1f} MB/s")
+    iguales = resultados["re.sub"] == resultados["normalizacion"]
+    print(f"   {'✓' if iguales else '❌'} resultados idénticos")
+
+
+if __name__ == "__main__":
+    main()
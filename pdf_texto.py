@@ -0,0 +1,185 @@
+"""
+Extracción de texto de PDFs con caché en disco
+Una sola implementación para etiquetar_sentencias, preparar_datos,
+probar_clasificador, sistema_integrado, citas y duplicados.
+
+El texto se guarda por página en data/cache/pdf_texto/, con clave sha256 del
+archivo + versión del extractor (y de PyPDF2). Si el PDF no cambió, las
+corridas siguientes leen el JSON de la caché y no importan PyPDF2.
+
+Para clasificar o previsualizar alcanza con las primeras páginas: iter_pages y
+extract_text aceptan un presupuesto (max_pages / max_chars) y dejan de
+extraer al alcanzarlo, así la latencia no crece con el largo del documento.
+
+Uso (pre-calentar la caché):
+    python pdf_texto.py data/raw
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+
+EXTRACTOR_VERSION = "1"     # subir si cambia la forma de extraer el texto
+CACHE_DIR = Path(os.getenv("LEXGO_PDF_CACHE", "data/cache/pdf_texto"))
+
+# Presupuesto de extracción para clasificar (probar_clasificador, sistema_integrado):
+# las señales de etapa ("córrese traslado", "abierta a prueba", "resuelvo")
+# aparecen en las primeras páginas
+PAGINAS_CLASIFICACION = 5
+CHARS_CLASIFICACION = 20000
+
+try:
+    _PYPDF2_VERSION = version("PyPDF2")
+except PackageNotFoundError:
+    _PYPDF2_VERSION = "na"
+
+# Versión del texto extraído: cambia con el extractor o con PyPDF2. Las cachés
+# de texto derivado (p. ej. la del dataset en preparar_datos) la usan como clave.
+VERSION_TEXTO = f"v{EXTRACTOR_VERSION}-pypdf2-{_PYPDF2_VERSION}"
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def file_sha256(data_or_path):
+    if isinstance(data_or_path, (bytes, bytearray)):
+        return hashlib.sha256(data_or_path).hexdigest()
+    h = hashlib.sha256()
+    if hasattr(data_or_path, "read"):
+        # File object: se hashea desde la posición actual y se vuelve a ella
+        pos = data_or_path.tell()
+        for chunk in iter(lambda: data_or_path.read(1024 * 1024), b""):
+            h.update(chunk)
+        data_or_path.seek(pos)
+        return h.hexdigest()
+    with open(data_or_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_path(sha, cache_dir):
+    return Path(cache_dir) / sha[:2] / f"{sha}.{VERSION_TEXTO}.json"
+
+
+def _iter_parse(fuente):
+    """Rinde el texto de cada página con PyPDF2, sin extraer las que no se piden."""
+    import PyPDF2
+    if isinstance(fuente, (bytes, bytearray)):
+        fuente = io.BytesIO(fuente)
+    if hasattr(fuente, "read"):
+        for page in PyPDF2.PdfReader(fuente).pages:
+            yield page.extract_text() or ""
+        return
+    with open(fuente, "rb") as fh:
+        for page in PyPDF2.PdfReader(fh).pages:
+            yield page.extract_text() or ""
+
+
+def _leer_cache(path):
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None  # caché corrupta: se vuelve a extraer
+
+
+def _escribir_cache(path, pages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: varios procesos pueden extraer el mismo PDF a la vez
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"extractor": EXTRACTOR_VERSION, "pypdf2": _PYPDF2_VERSION, "pages": pages},
+                  fh, ensure_ascii=False)
+    tmp.replace(path)
+
+
+def iter_pages(fuente, max_pages=None, max_chars=None, cache_dir=CACHE_DIR, usar_cache=True):
+    """
+    Rinde el texto de cada página de forma perezosa y se detiene al llegar a
+    max_pages páginas o max_chars caracteres acumulados (la página que cruza el
+    límite se incluye). `fuente` es una ruta, los bytes del PDF o un file object
+    binario con seek (p. ej. una descarga en un SpooledTemporaryFile).
+    Lee de la caché si está; si no, PyPDF2 extrae solo las páginas necesarias.
+    Solo una extracción completa se guarda en la caché.
+    """
+    path = _cache_path(file_sha256(fuente), cache_dir) if usar_cache else None
+    cacheadas = _leer_cache(path) if path else None
+    if cacheadas is not None:
+        _stats["hits"] += 1
+        paginas = iter(cacheadas)
+    else:
+        _stats["misses"] += 1
+        paginas = _iter_parse(fuente)
+    extraidas = []
+    chars = 0
+    for n, page in enumerate(paginas, 1):
+        extraidas.append(page)
+        yield page
+        chars += len(page)
+        if (max_pages and n >= max_pages) or (max_chars and chars >= max_chars):
+            return
+    if path and cacheadas is None:
+        _escribir_cache(path, extraidas)
+
+
+def extract_pages(fuente, cache_dir=CACHE_DIR, usar_cache=True):
+    """
+    Lista con el texto de cada página. `fuente` es una ruta o los bytes del PDF.
+    Lanza la excepción de PyPDF2 si el PDF no se puede leer (no se cachea).
+    """
+    return list(iter_pages(fuente, cache_dir=cache_dir, usar_cache=usar_cache))
+
+
+def extract_text(fuente, max_pages=None, max_chars=None, cache_dir=CACHE_DIR, usar_cache=True):
+    """
+    Texto completo: las páginas concatenadas, igual que el loop `text += page.extract_text()`.
+    Con max_pages/max_chars solo se extraen las primeras páginas (ver iter_pages)
+    y el resultado se corta en max_chars caracteres.
+    """
+    text = "".join(iter_pages(fuente, max_pages, max_chars, cache_dir, usar_cache))
+    return text[:max_chars] if max_chars else text
+
+
+def extract_text_from_pdf(pdf_path, max_pages=None, max_chars=None):
+    """extract_text para los scripts interactivos: si el PDF no se puede leer imprime el error y devuelve None."""
+    try:
+        return extract_text(pdf_path, max_pages=max_pages, max_chars=max_chars)
+    except Exception as e:
+        print(f"❌ Error en {pdf_path}: {e}")
+        return None
+
+
+def cache_stats():
+    """Aciertos/fallos de caché en este proceso."""
+    return dict(_stats)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("carpeta", nargs="?", default="data/raw")
+    ap.add_argument("--cache", default=str(CACHE_DIR))
+    args = ap.parse_args()
+
+    pdfs = sorted(Path(args.carpeta).rglob("*.pdf"))
+    t0 = time.perf_counter()
+    errores = 0
+    for pdf in pdfs:
+        try:
+            extract_pages(pdf, args.cache)
+        except Exception as e:
+            print(f"❌ Error en {pdf}: {e}")
+            errores += 1
+    stats = cache_stats()
+    print(f"✓ {len(pdfs)} PDFs en {time.perf_counter() - t0:.2f}s "
+          f"({stats['hits']} desde caché, {stats['misses']} extraídos, {errores} errores)")
+
+
+if __name__ == "__main__":
+    main()
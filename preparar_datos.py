@@ -1,49 +1,131 @@
 """
 Preparación de datos para entrenamiento del clasificador
 Tesis LexGO - Procesamiento de sentencias etiquetadas
+
+Build incremental: el texto limpio de cada PDF se guarda en CACHE_DOCUMENTOS
+junto con su tamaño, mtime y sha256. Solo se extraen los PDFs nuevos o que
+cambiaron; un cambio de etiqueta no requiere re-extraer. El split se regenera
+siempre desde el dataset completo (mismo random_state), así el resultado es
+idéntico al de un build desde cero.
+
+Uso:
+    python preparar_datos.py [--completo]
 """
 
+import argparse
+import json
+import os
+import time
 import pandas as pd
-import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+from pdf_texto import extract_text, file_sha256, VERSION_TEXTO
+from normalizacion import limpiar
+from dataset_procesado import guardar_dataset, DATASET_PARQUET
 from pathlib import Path
-import re
 from sklearn.model_selection import train_test_split
 
+# Extracción + limpieza en paralelo (un proceso por core)
+WORKERS = os.cpu_count() or 1
+CHUNKSIZE = 4          # PDFs por tarea enviada a cada proceso
+
+# Caché de textos limpios por documento (build incremental)
+CACHE_DOCUMENTOS = Path("data/cache/dataset_documentos.json")
+LIMPIEZA_VERSION = "1"  # subir si cambia clean_text: invalida la caché
+
 def extract_full_text(pdf_path):
-    """Extrae texto completo de un PDF"""
+    """Extrae texto completo de un PDF (con caché, ver pdf_texto.py)"""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+        return extract_text(pdf_path)
     except Exception as e:
         print(f"❌ Error extrayendo {pdf_path}: {e}")
         return None
 
 def clean_text(text):
-    """Limpia y normaliza el texto"""
-    if not text:
-        return ""
-    
-    # Convertir a minúsculas
-    text = text.lower()
-    
-    # Remover saltos de línea múltiples
-    text = re.sub(r'\n+', ' ', text)
-    
-    # Remover espacios múltiples
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remover caracteres especiales pero mantener puntuación importante
-    text = re.sub(r'[^\w\s\.,;:()\-]', '', text)
-    
-    return text.strip()
+    """Limpia y normaliza el texto (minúsculas, espacios, puntuación; ver normalizacion.py)"""
+    return limpiar(text)
+
+def procesar_pdf(pdf_path):
+    """Extrae y limpia un PDF. Devuelve (texto_limpio o None, bytes del PDF)."""
+    texto = extract_full_text(pdf_path)
+    return (clean_text(texto) if texto else None), Path(pdf_path).stat().st_size
+
+def procesar_pdfs(pdf_paths, workers=WORKERS, chunksize=CHUNKSIZE):
+    """
+    Rinde (pdf_path, texto_limpio) en el mismo orden de entrada, repartiendo
+    extracción y limpieza en un pool de procesos. Informa progreso y throughput.
+    """
+    total = len(pdf_paths)
+    t0 = time.perf_counter()
+    mb = 0.0
+    paso = max(10, total // 20)
+    if workers > 1 and total > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        resultados = pool.map(procesar_pdf, pdf_paths, chunksize=chunksize)
+    else:
+        pool = None
+        resultados = map(procesar_pdf, pdf_paths)
+    try:
+        for i, (pdf_path, (texto, size)) in enumerate(zip(pdf_paths, resultados), 1):
+            mb += size / 1e6
+            if i % paso == 0 or i == total:
+                dt = time.perf_counter() - t0
+                print(f"   Procesados: {i}/{total} ({i / dt:.1f} PDFs/s, {mb / dt:.1f} MB/s)")
+            yield pdf_path, texto
+    finally:
+        if pool:
+            pool.shutdown()
+
+def cargar_cache_documentos(path=CACHE_DOCUMENTOS):
+    """
+    filename → {size, mtime_ns, sha256, etapa, texto}; vacío si no hay caché o
+    es de otra versión de la limpieza o del extractor de PDF (pdf_texto).
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}  # caché corrupta: build completo
+    if data.get("limpieza") != LIMPIEZA_VERSION or data.get("extractor") != VERSION_TEXTO:
+        return {}
+    return data.get("documentos", {})
+
+def guardar_cache_documentos(documentos, path=CACHE_DOCUMENTOS):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"limpieza": LIMPIEZA_VERSION, "extractor": VERSION_TEXTO,
+                   "documentos": documentos}, fh, ensure_ascii=False)
+    tmp.replace(path)
+
+def documento_vigente(entrada, pdf_path):
+    """
+    (vigente, actualizada). vigente: la entrada de caché corresponde al PDF
+    actual. Con tamaño y mtime iguales no se lee el archivo; si el mtime
+    difiere se compara el sha256 (un `touch` o una copia no obligan a
+    re-extraer) y se corrige el mtime de la entrada: actualizada indica que
+    hay que guardar la caché para no volver a hashear el PDF.
+    """
+    if entrada is None:
+        return False, False
+    st = pdf_path.stat()
+    if entrada["size"] == st.st_size and entrada["mtime_ns"] == st.st_mtime_ns:
+        return True, False
+    if entrada["size"] != st.st_size or entrada["sha256"] != file_sha256(pdf_path):
+        return False, False
+    entrada["mtime_ns"] = st.st_mtime_ns
+    return True, True
 
 def main():
     """Procesa sentencias etiquetadas y crea dataset de entrenamiento"""
     
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--completo", action="store_true", help="Ignorar la caché y re-extraer todos los PDFs")
+    args = ap.parse_args()
+    
     print("📊 PREPARACIÓN DE DATOS PARA ENTRENAMIENTO")
     print("=" * 60)
     
@@ -62,31 +144,63 @@ def main():
     print("\n📈 Distribución de etiquetas:")
     print(df_etiquetas['etapa'].value_counts())
     
-    # Extraer texto completo de cada PDF
-    print("\n🔄 Extrayendo texto completo de PDFs...")
-    textos_completos = []
-    etapas = []
-    archivos_procesados = []
-    
-    for idx, row in df_etiquetas.iterrows():
-        pdf_path = Path("data/raw") / row['filename']
+    # Extraer texto completo de cada PDF (solo nuevos o modificados)
+    documentos = {} if args.completo else cargar_cache_documentos()
+    pendientes = []
+    a_extraer = []
+    etiquetas_cambiadas = 0
+    cache_sucia = False    # mtime corregido de un PDF sin cambios
+    for row in df_etiquetas.itertuples(index=False):
+        pdf_path = Path("data/raw") / row.filename
         
         if not pdf_path.exists():
-            print(f"⚠️  No encontrado: {row['filename']}")
+            print(f"⚠️  No encontrado: {row.filename}")
             continue
-        
-        texto = extract_full_text(pdf_path)
-        
-        if texto:
-            texto_limpio = clean_text(texto)
-            textos_completos.append(texto_limpio)
-            etapas.append(row['etapa'])
-            archivos_procesados.append(row['filename'])
-            
-            if (idx + 1) % 10 == 0:
-                print(f"   Procesados: {idx + 1}/{len(df_etiquetas)}")
+        pendientes.append((pdf_path, row))
+        entrada = documentos.get(row.filename)
+        vigente, actualizada = documento_vigente(entrada, pdf_path)
+        cache_sucia = cache_sucia or actualizada
+        if vigente:
+            if entrada["etapa"] != row.etapa:
+                entrada["etapa"] = row.etapa
+                etiquetas_cambiadas += 1
+        else:
+            a_extraer.append((pdf_path, row))
     
-    print(f"\n✅ Textos extraídos: {len(textos_completos)}")
+    print(f"\n♻️  Desde caché: {len(pendientes) - len(a_extraer)} documentos"
+          f" ({etiquetas_cambiadas} con etiqueta cambiada)")
+    
+    t0 = time.perf_counter()
+    if a_extraer:
+        print(f"🔄 Extrayendo texto completo de {len(a_extraer)} PDFs nuevos o modificados ({WORKERS} procesos)...")
+        resultados = procesar_pdfs([pdf_path for pdf_path, _ in a_extraer])
+        for (pdf_path, row), (_, texto_limpio) in zip(a_extraer, resultados):
+            if texto_limpio is None:
+                documentos.pop(row.filename, None)  # no se cachea: se reintenta en la próxima corrida
+                continue
+            st = pdf_path.stat()
+            documentos[row.filename] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'sha256': file_sha256(pdf_path),
+                'etapa': row.etapa,
+                'texto': texto_limpio
+            }
+    if a_extraer or etiquetas_cambiadas or cache_sucia or args.completo:
+        guardar_cache_documentos(documentos)
+    
+    # El dataset sigue el orden de sentencias_etiquetadas.csv, como en un build completo
+    textos_completos = []
+    etapas = []
+    archivos_procesados = []
+    for _, row in pendientes:
+        entrada = documentos.get(row.filename)
+        if entrada is not None:
+            textos_completos.append(entrada['texto'])
+            etapas.append(row.etapa)
+            archivos_procesados.append(row.filename)
+    
+    print(f"\n✅ Textos disponibles: {len(textos_completos)} ({len(a_extraer)} extraídos en {time.perf_counter() - t0:.1f}s)")
     
     # Crear DataFrame procesado
     df_procesado = pd.DataFrame({
@@ -146,10 +260,17 @@ def main():
     # Guardar dataset completo también
     df_procesado.to_csv('data/processed/dataset_completo.csv', index=False)
     
+    # Formato columnar (si hay pyarrow): lo leen entrenar/probar_clasificador
+    parquet = guardar_dataset(df_procesado.loc[X_train.index], df_procesado.loc[X_test.index])
+    
     print("\n💾 Archivos guardados:")
     print("   ✓ data/processed/train.csv")
     print("   ✓ data/processed/test.csv")
     print("   ✓ data/processed/dataset_completo.csv")
+    if parquet:
+        print(f"   ✓ {parquet}")
+    else:
+        print(f"   ⚠️  {DATASET_PARQUET} no generado, se usan los CSV (instalá pyarrow)")
     
     print("\n✅ PREPARACIÓN COMPLETADA")
     print("\n⏭️  Próximo paso: python entrenar_clasificador.py")
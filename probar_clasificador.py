@@ -4,7 +4,9 @@ Tesis LexGO - Testing del modelo ML
 """
 
 import pickle
-import PyPDF2
+from pdf_texto import extract_text_from_pdf, PAGINAS_CLASIFICACION, CHARS_CLASIFICACION
+from dataset_procesado import cargar_split, existe_dataset
+from normalizacion import limpiar
 from pathlib import Path
 
 def cargar_modelo():
@@ -20,22 +22,9 @@ def cargar_modelo():
         print("   Primero ejecuta: python entrenar_clasificador.py")
         return None, None
 
-def extract_text_from_pdf(pdf_path):
-    """Extrae texto de un PDF"""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return None
-
 def clasificar_texto(texto, vectorizer, clf):
     """Clasifica un texto y retorna predicción con probabilidades"""
-    texto_vec = vectorizer.transform([texto.lower()])
+    texto_vec = vectorizer.transform([limpiar(texto)])
     prediccion = clf.predict(texto_vec)[0]
     probabilidades = clf.predict_proba(texto_vec)[0]
     
@@ -82,7 +71,7 @@ def main():
                 continue
             
             print("\n🔄 Extrayendo texto...")
-            texto = extract_text_from_pdf(pdf_path)
+            texto = extract_text_from_pdf(pdf_path, PAGINAS_CLASIFICACION, CHARS_CLASIFICACION)
             
             if texto:
                 print(f"✓ Texto extraído: {len(texto)} caracteres")
@@ -122,25 +111,24 @@ def main():
         
         elif opcion == '3':
             # Evaluar todos los test
-            import pandas as pd
-            
-            test_path = "data/processed/test.csv"
-            if not Path(test_path).exists():
-                print("❌ No se encontró test.csv")
+            if not existe_dataset("test"):
+                print("❌ No se encontró el dataset de test")
                 continue
             
-            test_df = pd.read_csv(test_path)
+            test_df = cargar_split("test")
             
             print(f"\n🔄 Evaluando {len(test_df)} documentos de test...\n")
             
+            # El texto de test ya está normalizado: se vectoriza todo junto, sin limpiar de nuevo
+            predicciones = clf.predict(vectorizer.transform(test_df['texto']))
+            
             correctos = 0
-            for idx, row in test_df.iterrows():
-                prediccion, _ = clasificar_texto(row['texto'], vectorizer, clf)
-                correcto = prediccion == row['etapa']
+            for idx, (row, prediccion) in enumerate(zip(test_df.itertuples(index=False), predicciones)):
+                correcto = prediccion == row.etapa
                 correctos += correcto
                 
                 simbolo = "✓" if correcto else "✗"
-                print(f"{simbolo} {idx+1}/{len(test_df)}: Real={row['etapa']}, Predicho={prediccion}")
+                print(f"{simbolo} {idx+1}/{len(test_df)}: Real={row.etapa}, Predicho={prediccion}")
             
             accuracy = correctos / len(test_df)
             print(f"\n📊 Accuracy en test: {accuracy:.2%} ({correctos}/{len(test_df)})")
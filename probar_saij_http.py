@@ -0,0 +1,98 @@
+"""
+Prueba del backend HTTP de SAIJ contra un servidor local
+Levanta un http.server que sirve respuestas de /busqueda
+(data/fixtures/saij_http/busqueda_o{offset}.json) y verifica que
+buscar_laboral_pba_http pagine y arme las mismas filas que _parse_cards.
+
+OJO: las respuestas son SINTÉTICAS (UUIDs de relleno "…-abcd-ef0123456789",
+carátulas inventadas), armadas con la forma que espera parse_results; no son
+capturas del /busqueda real. La prueba cubre paginación, parámetros y armado
+de filas, pero no que el formato de SAIJ coincida: para eso hay que
+reemplazarlas por respuestas reales (recortadas) del endpoint.
+
+Uso:
+    python probar_saij_http.py
+"""
+
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from saij_http import buscar_laboral_pba_http, SAIJ_BUSQUEDA_PATH
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "data/fixtures/saij_http"
+CLAVES_FILA = {"titulo", "tribunal", "fecha", "link", "resumen"}
+
+
+class SaijGrabado(BaseHTTPRequestHandler):
+    """Responde /busqueda?o=N con el JSON (sintético) de ese offset."""
+    pedidos = []
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        SaijGrabado.pedidos.append(params)
+        fixture = FIXTURES_DIR / f"busqueda_o{params.get('o', ['0'])[0]}.json"
+        if url.path != SAIJ_BUSQUEDA_PATH or not fixture.exists():
+            self.send_error(404)
+            return
+        body = fixture.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def servidor_local():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), SaijGrabado)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def main():
+    print("🧪 PRUEBA BACKEND HTTP SAIJ (servidor local)")
+    print("=" * 60)
+
+    srv, base_url = servidor_local()
+    try:
+        rows = buscar_laboral_pba_http(texto="despido con causa",
+                                       fecha_desde="2018-01-01", fecha_hasta="2025-12-31",
+                                       max_paginas=5, pausa_seg=0, base_url=base_url)
+    finally:
+        srv.shutdown()
+
+    errores = []
+    if len(SaijGrabado.pedidos) != 2:
+        errores.append(f"se esperaban 2 pedidos (corta por totalSearchResults), hubo {len(SaijGrabado.pedidos)}")
+    primero = SaijGrabado.pedidos[0] if SaijGrabado.pedidos else {}
+    if "texto:despido con causa" not in primero.get("r", [""])[0]:
+        errores.append("el parámetro r no incluye el texto buscado")
+    if "Jurisdicción/Provincia de Buenos Aires" not in primero.get("f", [""])[0]:
+        errores.append("el parámetro f no filtra por jurisdicción")
+    if len(rows) != 32:
+        errores.append(f"se esperaban 32 filas, hubo {len(rows)}")
+    for row in rows:
+        if set(row) != CLAVES_FILA:
+            errores.append(f"claves inesperadas: {sorted(row)}")
+            break
+        if not row["link"].startswith(base_url + "/"):
+            errores.append(f"link fuera del servidor local: {row['link']}")
+            break
+
+    print(f"✓ Pedidos: {len(SaijGrabado.pedidos)} | Filas: {len(rows)}")
+    if rows:
+        print(f"   Ejemplo: {rows[0]}")
+    if errores:
+        for e in errores:
+            print(f"✗ {e}")
+        raise SystemExit(1)
+    print("\n✅ Backend HTTP OK")
+
+
+if __name__ == "__main__":
+    main()
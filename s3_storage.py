@@ -0,0 +1,202 @@
+"""
+Capa compartida de almacenamiento en S3
+- Un único cliente boto3 configurado (pool de conexiones y reintentos), thread-safe.
+- put_many: muchas subidas chicas en paralelo con resultado/error por objeto.
+- Subidas en streaming: lee de archivos o respuestas HTTP por bloques, calcula
+  SHA-256 de forma incremental y sube con multipart upload en
+  partes paralelas, de modo que la memoria no depende del tamaño del archivo.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+CHUNK_SIZE = 1024 * 1024            # lectura de a 1 MB
+PART_SIZE = 8 * 1024 * 1024         # S3 exige >= 5 MB por parte (salvo la última)
+MAX_PARALLEL_PARTS = 4              # partes en vuelo a la vez (acota la memoria)
+SPOOL_MAX_BYTES = 8 * 1024 * 1024   # descargas más grandes se bajan a disco
+S3_REGION_DEFAULT = "us-east-1"
+S3_MAX_POOL = 50                    # conexiones HTTP reutilizables del cliente
+BATCH_WORKERS = 32                  # subidas simultáneas en put_many
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Cliente S3 compartido por todo el proceso. Se construye una sola vez (sesión,
+    credenciales, TLS); los clientes boto3 son thread-safe una vez creados.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                # Se lee acá (no al importar) para respetar el .env que cargan los scripts
+                region = os.getenv("AWS_REGION", S3_REGION_DEFAULT)
+                session = boto3.session.Session(
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    aws_session_token=os.getenv("AWS_SESSION_TOKEN"),
+                    region_name=region,
+                )
+                _CLIENT = session.client("s3", region_name=region, config=Config(
+                    max_pool_connections=S3_MAX_POOL,
+                    retries={"max_attempts": 5, "mode": "adaptive"},
+                    tcp_keepalive=True,
+                ))
+    return _CLIENT
+
+
+def _put_args(bucket, key, body, content_type=None, metadata=None):
+    extra = {
+        "Bucket": bucket,
+        "Key": key,
+        "Body": body,
+        "ServerSideEncryption": "AES256",
+    }
+    if content_type:
+        extra["ContentType"] = content_type
+    if metadata:
+        extra["Metadata"] = {str(k): str(v) for k, v in metadata.items()}
+    return extra
+
+
+def put_bytes(bucket, key, data, content_type=None, metadata=None, client=None):
+    (client or get_s3_client()).put_object(**_put_args(bucket, key, data, content_type, metadata))
+    return f"s3://{bucket}/{key}"
+
+
+def put_many(bucket, objetos, max_workers=BATCH_WORKERS, client=None):
+    """
+    Sube en paralelo una lista de dicts {key, data, content_type?, metadata?}.
+    Devuelve, en el mismo orden, {key, s3, error} por objeto (error None si salió bien).
+    """
+    cli = client or get_s3_client()
+
+    def _put(obj):
+        try:
+            uri = put_bytes(bucket, obj["key"], obj["data"], obj.get("content_type"),
+                            obj.get("metadata"), client=cli)
+            return {"key": obj["key"], "s3": uri, "error": None}
+        except Exception as e:
+            return {"key": obj["key"], "s3": None, "error": f"{type(e).__name__}: {e}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, S3_MAX_POOL))) as pool:
+        return list(pool.map(_put, objetos))
+
+
+def iter_file(fh_or_path, chunk_size=CHUNK_SIZE):
+    """Rinde el contenido de un archivo (ruta o file object) de a bloques."""
+    if hasattr(fh_or_path, "read"):
+        while True:
+            chunk = fh_or_path.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    with open(fh_or_path, "rb") as fh:
+        yield from iter_file(fh, chunk_size)
+
+
+def file_digest(path, chunk_size=CHUNK_SIZE):
+    """SHA-256 y tamaño de un archivo sin cargarlo entero."""
+    h = hashlib.sha256()
+    size = 0
+    for chunk in iter_file(path, chunk_size):
+        h.update(chunk)
+        size += len(chunk)
+    return h.hexdigest(), size
+
+
+def spool_stream(chunks, max_memory=SPOOL_MAX_BYTES):
+    """
+    Copia un stream (p. ej. r.iter_content()) a un archivo temporal calculando SHA-256.
+    Devuelve (file object posicionado al inicio, sha256, tamaño).
+    """
+    h = hashlib.sha256()
+    size = 0
+    tmp = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            h.update(chunk)
+            size += len(chunk)
+            tmp.write(chunk)
+    except Exception:
+        # La descarga se cortó: no dejar el archivo temporal (ni el buffer) abierto
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp, h.hexdigest(), size
+
+
+def _iter_parts(chunks, part_size):
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        while len(buf) >= part_size:
+            yield bytes(buf[:part_size])
+            del buf[:part_size]
+    if buf:
+        yield bytes(buf)
+
+
+def upload_stream(bucket, key, chunks, content_type=None, metadata=None,
+                  part_size=PART_SIZE, max_parallel_parts=MAX_PARALLEL_PARTS, client=None):
+    """
+    Sube un stream de bytes a s3://bucket/key.
+    Si entra en una sola parte usa put_object; si no, multipart upload con hasta
+    max_parallel_parts partes subiéndose a la vez. Ante la primera parte que
+    falla deja de leer el stream y aborta el multipart.
+    """
+    client = client or get_s3_client()
+    parts = _iter_parts(chunks, part_size)
+    first = next(parts, b"")
+    second = next(parts, None)
+    if second is None:
+        return put_bytes(bucket, key, first, content_type, metadata, client=client)
+
+    extra = _put_args(bucket, key, None, content_type, metadata)
+    del extra["Body"]
+    upload_id = client.create_multipart_upload(**extra)["UploadId"]
+    slots = threading.BoundedSemaphore(max_parallel_parts)
+    errores = []
+
+    def _put_part(number, body):
+        try:
+            resp = client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                      PartNumber=number, Body=body)
+            return {"PartNumber": number, "ETag": resp["ETag"]}
+        except Exception as e:
+            errores.append(e)
+            raise
+        finally:
+            slots.release()
+
+    try:
+        futures = []
+        with ThreadPoolExecutor(max_workers=max_parallel_parts) as pool:
+            for number, body in enumerate(_chain_parts(first, second, parts), start=1):
+                slots.acquire()  # backpressure: no leer más partes que las que se suben
+                if errores:
+                    raise errores[0]
+                futures.append(pool.submit(_put_part, number, body))
+        completed = [f.result() for f in futures]
+        client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                         MultipartUpload={"Parts": completed})
+    except Exception:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return f"s3://{bucket}/{key}"
+
+
+def _chain_parts(first, second, rest):
+    yield first
+    yield second
+    yield from rest
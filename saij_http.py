@@ -0,0 +1,140 @@
+"""
+Backend HTTP (sin navegador) para el buscador de SAIJ.
+Reproduce la consulta de apply_filters (texto, fuero, jurisdicción, rango de fechas)
+contra el endpoint JSON que usa la propia página de resultados y devuelve las
+mismas filas que _parse_cards: titulo, tribunal, fecha, link, resumen.
+"""
+
+import json
+import time
+import urllib.parse
+
+import requests
+from dateutil.parser import parse as dtparse
+
+SAIJ_BASE_URL = "https://www.saij.gob.ar"
+SAIJ_BUSQUEDA_PATH = "/busqueda"
+RESULTADOS_POR_PAGINA = 25
+REQUESTS_TIMEOUT = (10, 25)  # (connect, read)
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/126.0.0.0 Safari/537.36")
+
+
+def _fmt_iso(d):
+    if not d: return d
+    try: return dtparse(d).strftime("%Y-%m-%d")
+    except: return d
+
+
+def build_query(texto=None, fuero="Laboral", jurisdiccion="Provincia de Buenos Aires",
+                fecha_desde=None, fecha_hasta=None, offset=0, por_pagina=RESULTADOS_POR_PAGINA):
+    """Parámetros de /busqueda equivalentes a los filtros de apply_filters."""
+    facetas = [
+        "Total",
+        "Tipo de Documento/Jurisprudencia",
+        "Fecha",
+        "Organismo",
+        "Publicación",
+        f"Tema/{fuero}" if fuero else "Tema",
+        "Estado de Vigencia",
+        "Autor",
+        f"Jurisdicción/{jurisdiccion}" if jurisdiccion else "Jurisdicción",
+    ]
+    r = []
+    if texto:
+        r.append(f"texto:{texto}")
+    if fecha_desde or fecha_hasta:
+        r.append(f"fecha-rango:[{_fmt_iso(fecha_desde) or '*'} TO {_fmt_iso(fecha_hasta) or '*'}]")
+    return {
+        "o": offset,
+        "p": por_pagina,
+        "f": "|".join(facetas),
+        "s": "fecha-rango|DESC",
+        "v": "colapsada",
+        "r": " ".join(r),
+    }
+
+
+def _doc_link(base_url, metadata):
+    uuid = metadata.get("uuid") or ""
+    friendly = (metadata.get("friendly-url") or {}).get("description") or ""
+    if friendly:
+        return f"{base_url}/{friendly}/{uuid}"
+    return f"{base_url}/{uuid}" if uuid else ""
+
+
+def parse_results(payload, base_url=SAIJ_BASE_URL):
+    """Convierte la respuesta JSON de /busqueda en filas con las claves de _parse_cards."""
+    rows = []
+    seen = set()
+    lista = (payload.get("searchResults") or {}).get("documentResultList") or []
+    for item in lista:
+        try:
+            abstract = item.get("documentAbstract") or "{}"
+            doc = (json.loads(abstract) if isinstance(abstract, str) else abstract).get("document") or {}
+            meta = doc.get("metadata") or {}
+            content = doc.get("content") or {}
+
+            titulo = (content.get("titulo") or content.get("caratula") or "").strip()
+            link = _doc_link(base_url, meta)
+            if not titulo or (titulo, link) in seen:
+                continue
+
+            tribunal = (content.get("tribunal") or "").strip()
+            fecha = (content.get("fecha") or "").strip()
+            if fecha:
+                try: fecha = dtparse(fecha).strftime("%d/%m/%Y")
+                except: pass
+            resumen = (content.get("sumario") or content.get("texto") or "").strip()
+
+            rows.append({
+                "titulo": titulo,
+                "tribunal": tribunal,
+                "fecha": fecha,
+                "link": link,
+                "resumen": resumen
+            })
+            seen.add((titulo, link))
+        except (ValueError, AttributeError):
+            continue
+    return rows
+
+
+def iter_paginas_http(texto=None, fecha_desde=None, fecha_hasta=None,
+                      max_paginas=5, pausa_seg=0.3, base_url=SAIJ_BASE_URL,
+                      session=None):
+    """
+    Equivalente HTTP de iter_paginas: pagina /busqueda hasta max_paginas o hasta
+    que no haya más resultados, rindiendo las filas de cada página.
+    base_url permite apuntar a un servidor local.
+    """
+    sess = session or requests.Session()
+    sess.headers.setdefault("User-Agent", USER_AGENT)
+    url = urllib.parse.urljoin(base_url + "/", SAIJ_BUSQUEDA_PATH.lstrip("/"))
+    try:
+        for page in range(max_paginas):
+            params = build_query(texto=texto, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta,
+                                 offset=page * RESULTADOS_POR_PAGINA)
+            r = sess.get(url, params=params, timeout=REQUESTS_TIMEOUT)
+            r.raise_for_status()
+            payload = r.json()
+            rows = parse_results(payload, base_url=base_url)
+            yield rows
+
+            total = (payload.get("searchResults") or {}).get("totalSearchResults")
+            if not rows or (total is not None and (page + 1) * RESULTADOS_POR_PAGINA >= int(total)):
+                break
+            time.sleep(pausa_seg)
+    finally:
+        if session is None:
+            sess.close()
+
+
+def buscar_laboral_pba_http(texto=None, fecha_desde=None, fecha_hasta=None,
+                            max_paginas=5, pausa_seg=0.3, base_url=SAIJ_BASE_URL,
+                            session=None):
+    """Equivalente HTTP de buscar_laboral_pba (todas las páginas en una lista)."""
+    return [row for rows in iter_paginas_http(texto, fecha_desde, fecha_hasta, max_paginas,
+                                              pausa_seg, base_url, session)
+            for row in rows]
@@ -5,11 +5,23 @@ Tesis LexGO - Prototipo final
 """
 
 import pickle
-import PyPDF2
+from pdf_texto import iter_pages, PAGINAS_CLASIFICACION, CHARS_CLASIFICACION
+from normalizacion import limpiar
 import json
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 
+# Índice BM25 de normas (python corpus_chunks.py && python bm25_index.py build --chunks data/chunks)
+INDICE_NORMAS = 'data/bm25'
+TOP_K_NORMAS = 5
+
+# Presupuesto para buscar normas: más largo (las citas suelen estar en los
+# considerandos y el resuelvo), pero acotado para que la latencia no crezca con
+# expedientes de cientos de páginas. Se lee en la misma pasada que la clasificación.
+PAGINAS_NORMAS = 30
+CHARS_NORMAS = 150000
+
 # Para usar la API de Claude (deberás instalar: pip install anthropic)
 # import anthropic
 
@@ -25,21 +37,40 @@ def cargar_modelo():
         print("❌ Modelo no encontrado")
         return None, None
 
-def extract_text_from_pdf(pdf_path):
-    """Extrae texto de un PDF"""
+def cargar_indice_normas(index_dir=INDICE_NORMAS):
+    """Carga el índice de normas una sola vez. Devuelve None si no está construido."""
+    if not (Path(index_dir) / 'bm25.terms.json').exists():
+        return None
+    from bm25_index import BM25Index
+    return BM25Index(index_dir)
+
+def buscar_normas_relevantes(texto, indice, k=TOP_K_NORMAS):
+    """Normas/artículos del corpus más relevantes para el texto del documento"""
+    normas = []
+    for score, doc in indice.search_document(texto, k):
+        normas.append({
+            'id': doc['id'],
+            'norma': doc.get('parent_id') or doc['id'],
+            'articulo': doc.get('article'),
+            'titulo': doc.get('title'),
+            'score': round(score, 3)
+        })
+    return normas
+
+def extraer_paginas(pdf_path, max_pages, max_chars):
+    """Texto de las primeras páginas de un PDF (con caché, ver pdf_texto.py), None si falla"""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
-    except Exception as e:
+        return list(iter_pages(pdf_path, max_pages, max_chars))
+    except Exception:
         return None
 
+def texto_con_presupuesto(paginas, max_pages, max_chars):
+    """Mismo texto que extract_text(pdf, max_pages, max_chars), a partir de páginas ya leídas"""
+    return "".join(paginas[:max_pages])[:max_chars]
+
 def clasificar_etapa(texto, vectorizer, clf):
     """Clasifica la etapa procesal usando ML"""
-    texto_vec = vectorizer.transform([texto.lower()])
+    texto_vec = vectorizer.transform([limpiar(texto)])
     prediccion = clf.predict(texto_vec)[0]
     probabilidades = clf.predict_proba(texto_vec)[0]
     confianza = max(probabilidades)
@@ -202,7 +233,7 @@ def generar_timeline_con_fechas(eventos, fecha_inicio=None):
     
     return timeline
 
-def guardar_resultado(pdf_filename, etapa_predicha, confianza, timeline):
+def guardar_resultado(pdf_filename, etapa_predicha, confianza, timeline, normas=None):
     """Guarda el resultado en JSON"""
     resultado = {
         'archivo': pdf_filename,
@@ -213,6 +244,8 @@ def guardar_resultado(pdf_filename, etapa_predicha, confianza, timeline):
         },
         'timeline': timeline
     }
+    if normas is not None:
+        resultado['normas_relevantes'] = normas
     
     # Guardar en results
     output_path = Path('results') / f'{Path(pdf_filename).stem}_analisis.json'
@@ -234,6 +267,14 @@ def main():
     
     print("✓ Modelo ML cargado")
     
+    # Índice de normas (opcional): se carga una vez, antes de pedir el PDF
+    indice_normas = cargar_indice_normas()
+    if indice_normas is not None:
+        print(f"✓ Índice de normas cargado ({len(indice_normas)} fragmentos)")
+    else:
+        print(f"ℹ️  Sin índice de normas en {INDICE_NORMAS} (paso de normas relevantes omitido)")
+    pasos = 4 if indice_normas is not None else 3
+    
     # Solicitar PDF
     pdf_path = input("\n📄 Ruta del PDF a analizar: ").strip()
     
@@ -242,8 +283,14 @@ def main():
         return
     
     # Paso 1: Extraer texto
-    print("\n🔄 Paso 1/3: Extrayendo texto del PDF...")
-    texto = extract_text_from_pdf(pdf_path)
+    print(f"\n🔄 Paso 1/{pasos}: Extrayendo texto del PDF...")
+    # Una sola lectura: si hay índice de normas se extiende hasta su presupuesto,
+    # y la clasificación usa solo las primeras páginas de lo leído
+    if indice_normas is not None:
+        paginas = extraer_paginas(pdf_path, PAGINAS_NORMAS, CHARS_NORMAS)
+    else:
+        paginas = extraer_paginas(pdf_path, PAGINAS_CLASIFICACION, CHARS_CLASIFICACION)
+    texto = texto_con_presupuesto(paginas or [], PAGINAS_CLASIFICACION, CHARS_CLASIFICACION)
     
     if not texto:
         print("❌ No se pudo extraer texto")
@@ -252,19 +299,28 @@ def main():
     print(f"✓ Extraídos {len(texto)} caracteres")
     
     # Paso 2: Clasificar con ML
-    print("\n🤖 Paso 2/3: Clasificando etapa procesal (Modelo ML)...")
+    print(f"\n🤖 Paso 2/{pasos}: Clasificando etapa procesal (Modelo ML)...")
     etapa_predicha, confianza = clasificar_etapa(texto, vectorizer, clf)
     
     print(f"✓ Etapa identificada: {etapa_predicha}")
     print(f"✓ Confianza: {confianza:.1%}")
     
     # Paso 3: Generar timeline
-    print("\n📅 Paso 3/3: Generando timeline de eventos...")
+    print(f"\n📅 Paso 3/{pasos}: Generando timeline de eventos...")
     eventos = generar_timeline_eventos(etapa_predicha)
     timeline = generar_timeline_con_fechas(eventos)
     
     print(f"✓ {len(timeline)} eventos generados")
     
+    # Paso 4: Normas relevantes
+    normas = None
+    if indice_normas is not None:
+        print(f"\n⚖️  Paso 4/{pasos}: Buscando normas relevantes...")
+        t0 = time.perf_counter()
+        texto_normas = texto_con_presupuesto(paginas, PAGINAS_NORMAS, CHARS_NORMAS)
+        normas = buscar_normas_relevantes(texto_normas, indice_normas)
+        print(f"✓ {len(normas)} normas encontradas ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    
     # Mostrar resultado
     print("\n" + "=" * 70)
     print("📊 RESULTADO DEL ANÁLISIS")
@@ -289,8 +345,15 @@ def main():
             print(f"\n{i}. {evento['titulo']} ({fecha})")
             print(f"   {evento['descripcion']}")
     
+    if normas:
+        print("\n⚖️  NORMAS RELEVANTES:")
+        print("-" * 70)
+        for norma in normas:
+            articulo = f" art. {norma['articulo']}" if norma['articulo'] else ""
+            print(f"   • {norma['norma']}{articulo} — {norma['titulo']} ({norma['score']:.1f})")
+    
     # Guardar resultado
-    output_path = guardar_resultado(pdf_path, etapa_predicha, confianza, timeline)
+    output_path = guardar_resultado(pdf_path, etapa_predicha, confianza, timeline, normas)
     
     print("\n" + "=" * 70)
     print(f"💾 Resultado guardado en: {output_path}")
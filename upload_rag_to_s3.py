@@ -1,31 +1,22 @@
-import os, io, sys, re, json, gzip, glob, mimetypes, hashlib, argparse
+import os, io, sys, re, json, glob, mimetypes, argparse, tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-import boto3
+
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 import pytz
 
+from s3_storage import get_s3_client, put_bytes, file_digest, iter_file, upload_stream
+from jsonl_compress import compress_jsonl
+from corpus_shards import export_shards, MAX_SHARD_BYTES, MANIFEST_NAME as SHARDS_MANIFEST
+
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env", override=True)
 
-def s3_client():
-    region = "us-east-1"
-    session = boto3.session.Session(
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        aws_session_token=os.getenv("AWS_SESSION_TOKEN"),
-        region_name=region,
-    )
-    return session.client("s3", region_name=region)
-
-def compute_sha256_bytes(b: bytes) -> str:
-    h = hashlib.sha256()
-    h.update(b)
-    return h.hexdigest()
-
 def guess_content_type(path: str) -> str:
     if path.endswith(".jsonl.gz"): return "application/gzip"
+    if path.endswith(".jsonl.zst"): return "application/zstd"
     if path.endswith(".jsonl"):    return "application/x-ndjson"
     if path.endswith(".json"):     return "application/json"
     if path.endswith(".txt"):      return "text/plain; charset=utf-8"
@@ -35,19 +26,7 @@ def guess_content_type(path: str) -> str:
     return ct or "application/octet-stream"
 
 def s3_put_bytes(bucket: str, key: str, data: bytes, content_type: str = None, metadata: dict = None):
-    s3 = s3_client()
-    extra = {
-        "Bucket": bucket,
-        "Key": key,
-        "Body": data,
-        "ServerSideEncryption": "AES256",
-    }
-    if content_type:
-        extra["ContentType"] = content_type
-    if metadata:
-        extra["Metadata"] = {str(k): str(v) for k, v in metadata.items()}
-    s3.put_object(**extra)
-    return f"s3://{bucket}/{key}"
+    return put_bytes(bucket, key, data, content_type=content_type, metadata=metadata)
 
 def normalize_paths(paths):
     expanded = []
@@ -56,50 +35,167 @@ def normalize_paths(paths):
         expanded.extend(matches if matches else [p])
     return [m for m in expanded if os.path.exists(m)]
 
+SYNC_CACHE_PATH = BASE_DIR / ".s3_sync_cache.json"
+
+def list_remote_etags(bucket: str, prefix: str) -> dict:
+    """Listado remoto {key: ETag} bajo el prefijo (una página cada 1000 objetos)."""
+    etags = {}
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{prefix}/"):
+        for obj in page.get("Contents", []):
+            etags[obj["Key"]] = obj["ETag"]
+    return etags
+
+def load_sync_cache(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_sync_cache(path, cache: dict):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(cache, fh, indent=1, sort_keys=True)
+
+def remote_sha256(bucket: str, keys, etags: dict, cache: dict, workers: int) -> dict:
+    """
+    sha256 guardado como metadata de cada objeto remoto (None si no existe).
+    Si el ETag del listado coincide con el cacheado se usa el sha del cache;
+    si no, se hace HEAD (en paralelo) y se actualiza el cache.
+    """
+    result = {}
+    pendientes = []
+    for key in keys:
+        etag = etags.get(key)
+        if etag is None:
+            result[key] = None
+        elif cache.get(key, {}).get("etag") == etag:
+            result[key] = cache[key].get("sha256")
+        else:
+            pendientes.append(key)
+
+    def _head(key):
+        try:
+            resp = get_s3_client().head_object(Bucket=bucket, Key=key)
+            return key, resp["ETag"], resp.get("Metadata", {}).get("sha256")
+        except ClientError:
+            return key, None, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for key, etag, sha in pool.map(_head, pendientes):
+            result[key] = sha
+            if etag:
+                cache[key] = {"etag": etag, "sha256": sha}
+    return result
+
+def upload_task(bucket: str, task: dict, compress_workers: int = None) -> list:
+    if not task["compress"]:
+        s3_uri = upload_stream(bucket, task["key"], iter_file(task["local"]),
+                               content_type=task["content_type"], metadata=task["meta"])
+        return [{"local": task["local"], "s3": s3_uri, "content_type": task["content_type"]}]
+
+    # JSONL comprimido en paralelo por bloques + índice de bloques al lado
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, os.path.basename(task["key"]))
+        out, idx = compress_jsonl(task["local"], out, fmt=task["compress"], workers=compress_workers)
+        s3_uri = upload_stream(bucket, task["key"], iter_file(out),
+                               content_type=task["content_type"], metadata=task["meta"])
+        idx_key = f"{task['key']}.idx.json"
+        s3_uri_idx = upload_stream(bucket, idx_key, iter_file(idx),
+                                   content_type="application/json", metadata=task["meta"])
+    return [{"local": task["local"], "s3": s3_uri, "content_type": task["content_type"]},
+            {"local": task["local"], "s3": s3_uri_idx, "content_type": "application/json"}]
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--bucket", required=True, help="Nombre del S3 bucket")
     ap.add_argument("--prefix", required=True, help="Prefijo base en S3 (ej. biblioteca/laboral)")
-    ap.add_argument("--paths", nargs="+", required=True, help="Rutas/globs a subir (ej. rag_fulltexts.jsonl RAG_*.zip)")
-    ap.add_argument("--gzip-jsonl", action="store_true", help="Comprimir JSONL a .gz antes de subir")
+    ap.add_argument("--paths", nargs="*", default=[], help="Rutas/globs a subir (ej. rag_fulltexts.jsonl RAG_*.zip)")
+    ap.add_argument("--gzip-jsonl", action="store_true",
+                    help="Subir además el JSONL como .gz multi-miembro (compresión paralela + índice de bloques)")
+    ap.add_argument("--zstd-jsonl", action="store_true",
+                    help="Subir además el JSONL como .zst (requiere zstandard)")
+    ap.add_argument("--compress-workers", type=int, default=None,
+                    help="Procesos para comprimir (default: todos los cores)")
+    ap.add_argument("--shard-corpus", default=None,
+                    help="JSONL a exportar en shards y subir en paralelo bajo <prefix>/shards/")
+    ap.add_argument("--shard-dir", default=str(BASE_DIR / "data" / "shards"),
+                    help="Carpeta local de los shards")
+    ap.add_argument("--shard-mb", type=float, default=MAX_SHARD_BYTES / (1024 * 1024),
+                    help="Tamaño máximo por shard en MB")
+    ap.add_argument("--sync", action="store_true",
+                    help="Subir solo archivos nuevos o cambiados (compara sha256 con la metadata remota)")
+    ap.add_argument("--workers", type=int, default=4, help="Subidas/HEAD en paralelo")
+    ap.add_argument("--sync-cache", default=str(SYNC_CACHE_PATH),
+                    help="Cache local de ETag→sha256 remotos usado por --sync")
     args = ap.parse_args()
 
     bucket = args.bucket
     prefix = args.prefix.strip("/")
     files  = normalize_paths(args.paths)
-    if not files:
+    if not files and not args.shard_corpus:
         print("No se encontraron archivos para subir.")
         sys.exit(1)
 
-    uploaded = []
+    # Armar la lista de objetos a subir (hash y tamaño en una pasada por bloques)
+    tasks = []
+    if args.shard_corpus:
+        manifest_shards = export_shards(args.shard_corpus, args.shard_dir,
+                                        int(args.shard_mb * 1024 * 1024))
+        print(f"[SHARDS] {len(manifest_shards['shards'])} shards en {args.shard_dir}")
+        for name in [s["file"] for s in manifest_shards["shards"]] + [SHARDS_MANIFEST]:
+            path = os.path.abspath(os.path.join(args.shard_dir, name))
+            sha256, size = file_digest(path)
+            tasks.append({"local": path, "key": f"{prefix}/shards/{name}", "compress": None,
+                          "content_type": guess_content_type(path),
+                          "meta": {"sha256": sha256, "size_bytes": str(size),
+                                   "uploaded_at": datetime.utcnow().isoformat() + "Z"}})
+
     for path in files:
         path = os.path.abspath(path)
         basename = os.path.basename(path)
-        key = f"{prefix}/{basename}"
-
-        with open(path, "rb") as fh:
-            data = fh.read()
-
+        sha256, size = file_digest(path)
         meta = {
-            "sha256": compute_sha256_bytes(data),
-            "size_bytes": str(len(data)),
+            "sha256": sha256,
+            "size_bytes": str(size),
             "uploaded_at": datetime.utcnow().isoformat() + "Z",
         }
+        # Si es JSONL y se pidió gzip/zstd, subimos además la versión comprimida
+        if basename.endswith(".jsonl"):
+            if args.gzip_jsonl:
+                tasks.append({"local": path, "key": f"{prefix}/{basename}.gz", "compress": "gzip",
+                              "content_type": "application/gzip", "meta": meta})
+            if args.zstd_jsonl:
+                tasks.append({"local": path, "key": f"{prefix}/{basename}.zst", "compress": "zstd",
+                              "content_type": "application/zstd", "meta": meta})
+        # Subida "normal" (multipart con partes en paralelo si es grande)
+        tasks.append({"local": path, "key": f"{prefix}/{basename}", "compress": None,
+                      "content_type": guess_content_type(path), "meta": meta})
 
-        # Si es JSONL y se pidió gzip, subimos además .gz
-        if args.gzip_jsonl and basename.endswith(".jsonl"):
-            gz_name = basename + ".gz"
-            gz_key  = f"{prefix}/{gz_name}"
-            gz_bytes = gzip.compress(data, compresslevel=6)
-            s3_uri_gz = s3_put_bytes(bucket, gz_key, gz_bytes, content_type="application/gzip", metadata=meta)
-            uploaded.append({"local": path, "s3": s3_uri_gz, "content_type": "application/gzip"})
-            print(f"[OK] {s3_uri_gz}")
-
-        # Subida "normal"
-        ct = guess_content_type(path)
-        s3_uri = s3_put_bytes(bucket, key, data, content_type=ct, metadata=meta)
-        uploaded.append({"local": path, "s3": s3_uri, "content_type": ct})
-        print(f"[OK] {s3_uri}")
+    skipped = []
+    if args.sync:
+        cache = load_sync_cache(args.sync_cache)
+        etags = list_remote_etags(bucket, prefix)
+        remotos = remote_sha256(bucket, [t["key"] for t in tasks], etags, cache, args.workers)
+        save_sync_cache(args.sync_cache, cache)
+        pendientes = []
+        for t in tasks:
+            if remotos.get(t["key"]) == t["meta"]["sha256"]:
+                skipped.append({"local": t["local"], "s3": f"s3://{bucket}/{t['key']}",
+                                "sha256": t["meta"]["sha256"]})
+                print(f"[SKIP] s3://{bucket}/{t['key']} (sin cambios)")
+            else:
+                pendientes.append(t)
+        tasks = pendientes
+
+    uploaded = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(upload_task, bucket, t, args.compress_workers): t for t in tasks}
+        for fut in as_completed(futures):
+            for entry in fut.result():
+                uploaded.append(entry)
+                print(f"[OK] {entry['s3']}")
+    uploaded.sort(key=lambda e: e["s3"])
 
     # Subir manifiesto
     manifest = {
@@ -107,6 +203,7 @@ def main():
         "prefix": prefix,
         "generated_at": datetime.utcnow().isoformat() + "Z",
         "entries": uploaded,
+        "skipped": skipped,
     }
     manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
     ba_tz = pytz.timezone("America/Argentina/Buenos_Aires")